@@ -10,32 +10,43 @@
 
 # Imports
 
-from collections import namedtuple
-from itertools import permutations
+from collections import namedtuple, OrderedDict
+from itertools import product
+import os
+from random import Random
 from datetime import datetime
-from materials import GetMaterialPropertyByName
-from units import ConvertUnit
-from MiscFunctions import *
-from FileManagement import *
+from math import sqrt, copysign, log10
+from MiscFunctions import (get_von_mises, get_stress_component, get_principal_stresses, pair_principal_stresses, SI_length_factor, draw_sample, 
+							percentile, get_load_multipliers, max_relative_error, get_sines_constant)
+from FileManagement import ResultManager, SweepManager, ReliabilityManager, CheckpointManager
+from ResultReaders import ReaderPool
+from Scoping import ScopingIndex, NodeArray
 
 # Global variables
+# Both are filled on first use so that loading the extension does no work until a result is evaluated.
 
-context = ExtAPI.Context
-if context == "Mechanical":
-	'''This dictionary maps the midside nodes of all quadratic elements to their connected corner nodes'''
-	link = {}
-	# Quadratic brick
-	link.Add(ElementTypeEnum.kHex20,{ 8:[0,1], 9:[1,2], 10:[2,3], 11:[3,0], 12:[4,5], 13:[5,6], 14:[6,7], 15:[7,4], 16:[0,4], 17:[1,5], 18:[2,6], 19:[3,7]})
-	# Quadratic pyramid
-	link.Add(ElementTypeEnum.kPyramid13,{ 5:[0,1], 6:[1,2], 7:[2,3], 8:[3,0], 9:[0,4], 10:[1,4], 11:[2,4], 12:[3,4]})
-	# Quadratic quadrilateral
-	link.Add(ElementTypeEnum.kQuad8, { 4:[0,1], 5:[1,2], 6:[2,3], 7:[3,0]})
-	# Quadratic tetrahedral
-	link.Add(ElementTypeEnum.kTet10,{ 4:[0,1], 5:[1,2], 6:[2,0], 7:[0,3], 8:[1,3], 9:[2,3]})
-	# Quadratic triangle
-	link.Add(ElementTypeEnum.kTri6, { 3:[0,1], 4:[1,2], 5:[2,0]})
-	# Quadratic wedge
-	link.Add(ElementTypeEnum.kWedge15,{6:[0,1], 7:[1,2], 8:[2,0], 9:[3,4], 10:[4,5], 11:[5,3], 12:[0,3], 13:[1,4], 14:[2,5]})
+link = None					# Maps the midside nodes of all quadratic elements to their connected corner nodes
+stress_conv_factors = {}	# Stress conversion factors to SI units, memoized per result file and modification time
+scheduled_passes = {}		# Active "Evaluate All Fatigue" schedulers by analysis working directory
+
+def get_link():
+	'''Returns the midside node map, building it on the first call'''
+	global link
+	if link is None:
+		link = {}
+		# Quadratic brick
+		link.Add(ElementTypeEnum.kHex20,{ 8:[0,1], 9:[1,2], 10:[2,3], 11:[3,0], 12:[4,5], 13:[5,6], 14:[6,7], 15:[7,4], 16:[0,4], 17:[1,5], 18:[2,6], 19:[3,7]})
+		# Quadratic pyramid
+		link.Add(ElementTypeEnum.kPyramid13,{ 5:[0,1], 6:[1,2], 7:[2,3], 8:[3,0], 9:[0,4], 10:[1,4], 11:[2,4], 12:[3,4]})
+		# Quadratic quadrilateral
+		link.Add(ElementTypeEnum.kQuad8, { 4:[0,1], 5:[1,2], 6:[2,3], 7:[3,0]})
+		# Quadratic tetrahedral
+		link.Add(ElementTypeEnum.kTet10,{ 4:[0,1], 5:[1,2], 6:[2,0], 7:[0,3], 8:[1,3], 9:[2,3]})
+		# Quadratic triangle
+		link.Add(ElementTypeEnum.kTri6, { 3:[0,1], 4:[1,2], 5:[2,0]})
+		# Quadratic wedge
+		link.Add(ElementTypeEnum.kWedge15,{6:[0,1], 7:[1,2], 8:[2,0], 9:[3,4], 10:[4,5], 11:[5,3], 12:[0,3], 13:[1,4], 14:[2,5]})
+	return link
 	
 	
 # Callback Functions
@@ -54,6 +65,26 @@ def Create_Multiaxial_Stress_Result(analysis):
 def Create_Multiaxial_Life_Result(analysis):
 	analysis.CreateResultObject("Multiaxial Life")
 	
+def Create_Uniaxial_Safety_Factor_Result(analysis):
+	analysis.CreateResultObject("Uniaxial Safety Factor")
+	
+def Create_Multiaxial_Safety_Factor_Result(analysis):
+	analysis.CreateResultObject("Multiaxial Safety Factor")
+	
+def Evaluate_All_Fatigue(analysis):
+	'''Evaluates all fatigue results of the analysis in one coordinated pass, grouped by scoping so that results sharing 
+		a stress extraction are evaluated one after another.  Other results of the analysis are left as they are.  The 
+		evaluate callbacks share the reader, scopings, extractions and material lookups of the scheduler.'''
+	scheduler = FatigueScheduler(analysis)
+	scheduled_passes[analysis.WorkingDir] = scheduler
+	try:
+		for result in scheduler.get_fatigue_results():
+			result.Evaluate()
+	finally:
+		del scheduled_passes[analysis.WorkingDir]
+		scheduler.reader_pool.close()
+	ExtAPI.Log.WriteMessage(scheduler.summary())
+	
 def uniaxial_stress_eval(result, stepInfo, collector):
 	result.Controller.evaluate_uniaxial_stress(result, stepInfo, collector)
 	
@@ -65,6 +96,12 @@ def multiaxial_stress_eval(result, stepInfo, collector):
 	
 def multiaxial_life_eval(result, stepInfo, collector):
 	result.Controller.evaluate_multiaxial_life(result, stepInfo, collector)
+	
+def uniaxial_safety_factor_eval(result, stepInfo, collector):
+	result.Controller.evaluate_uniaxial_safety_factor(result, stepInfo, collector)
+	
+def multiaxial_safety_factor_eval(result, stepInfo, collector):
+	result.Controller.evaluate_multiaxial_safety_factor(result, stepInfo, collector)
 		
 def change_time_hist(result, property):
 	'''Toggles whether the time history is calculated'''
@@ -133,35 +170,41 @@ AnalysisType = namedtuple('AnalysisType', ['analysis', 'stress_state', 'output',
 	
 class UniaxialStressLife:
 
+	stress_state = "Uniaxial"
+	extraction_inputs = ("Prestress Time", "Storage")	# Inputs read by get_extraction_key, fixed once stresses are extracted
+	selector_inputs = ()								# Inputs that decide which other inputs the result has
+
 	### FatigueAnalysis Section 1: Initialization methods
 		
 	def __init__(self, api, result):
-		pass
+		self.reader_pool = None
+		self.scoping = None
+		self.checkpoint = None
+		self.scheduler = None
 		
-	def reinit(self, result, collector, eval_time):
+	def reinit(self, result, eval_time):
 		'''Reinitializes instance variables for each time step evaluated'''
 		self.result = result
 		self.analysis = result.Analysis
 		self.mesh = self.analysis.MeshData
 		self.geo_data = self.analysis.GeoData
-		self.stress_conv_factor = self.get_stress_conv_factor()
+		previous_pool = self.reader_pool
+		self.reader_pool = self.get_reader_pool(eval_time)
 		propGeo = self.result.Properties["Geometry"]
 		self.ref_ids = propGeo.Value.Ids
 		self.input = self.get_input()
-		if self.analysis_type.analysis == "Static":
-			self.eval_element_stresses = self.get_element_values(collector, eval_time, "S")
-			if self.analysis_type.prestress == "Yes":
-				self.prestress_element_stresses = self.get_element_values(collector, self.input["Prestress Time"], "S")
-		elif self.analysis_type.analysis == "Spectrum":
-			self.eval_element_stresses = self.get_element_values(collector, 2, "SPSD")
-		elif self.analysis_type.analysis == "Harmonic":
-			self.eval_element_stresses = self.get_element_values(collector, eval_time, "S")
+		self.scoping = self.get_scoping(self.reader_pool is previous_pool)
+		if self.scheduler is None:
+			self.material_properties = {}
+		else:
+			self.material_properties = self.scheduler.material_properties
 			
 	def get_input(self):
 		'''Extracts all user input from the result properties'''
 		rp = self.result.Properties
 		k_temperature = rp["Material"].Properties["Temperature Factor"].Value
-		dict = {"Temperature Factor": k_temperature}
+		storage = rp["Storage"].Value
+		dict = {"Temperature Factor": k_temperature, "Storage": storage}
 		if self.analysis_type.stress_state == "Uniaxial":
 			stress_comp = rp["Stress Component"].Value
 			mean_stress_theory = rp["Mean Stress Theory"].Properties["Mean Stress Theory"].Value
@@ -177,7 +220,8 @@ class UniaxialStressLife:
 			k_misc = rp["Material"].Properties["Miscellaneous Factor"].Value
 			dict.update({"Scatter Factor (Stress)": k_scatter_stress, "Scatter Factor (Life)": k_scatter_life, 
 					"Miscellaneous Factor": k_misc})
-		if self.analysis_type.notched == "Notched" and self.analysis_type.result_type.split(" ")[0] == "Damage":
+		if self.analysis_type.notched == "Notched" and (self.analysis_type.result_type.split(" ")[0] == "Damage" or 
+														self.analysis_type.result_type == "Safety Factor"):
 			cycle_sensitivity_correlation = rp["Material"].Properties["Notch"].Properties["Cycle Sensitivity Correlation"].Value
 			dict.update({"Cycle Sensitivity Correlation": cycle_sensitivity_correlation})
 		if self.analysis_type.analysis == "Static":
@@ -201,16 +245,17 @@ class UniaxialStressLife:
 			if self.analysis_type.analysis == "Spectrum":
 				scale_factor = float(rp["Scale Factor"].Value[0])
 				dict.update({"Scale Factor": scale_factor})
+		if self.analysis_type.result_type == "Safety Factor":
+			design_life = rp["Design Life"].Properties["Design Life"].Value
+			dict.update({"Design Life": design_life})
 		return dict
 		
-	def get_analysis_type(self, result, stepInfo, stress_state, output):
+	def get_analysis_type(self, result, eval_time, stress_state, output):
 		'''Collects all properties related to analysis/result type definition for use in later functions.  
 			Creates result manager.'''
 		rp = result.Properties
 		analysis = str(result.Analysis.AnalysisType)
-		if analysis != "Spectrum":
-			eval_time = stepInfo.Set
-		else:
+		if analysis == "Spectrum":
 			eval_time = 2
 		load_history = rp["Load History"].Properties["Load History"].Value
 		prestress = rp["Load History"].Properties["Load History"].Properties["Prestress Select"].Value
@@ -224,6 +269,8 @@ class UniaxialStressLife:
 					result_type = "Damage - Constant"
 			else:
 				result_type = "Cycles to Failure"
+		elif output == "Safety Factor":
+			result_type = "Safety Factor"
 		else:
 			result_type = "Stress"
 		# Determine selection type by attempting to access material
@@ -234,191 +281,557 @@ class UniaxialStressLife:
 		finally: self.analysis_type = AnalysisType(analysis, stress_state, output, selection, load_history, prestress, notched, result_type)
 		self.result_manager = ResultManager(result, self.analysis_type, eval_time)
 		
-	def get_element_values(self, collector, time, result_name):
-		'''Collects all element corner node stresses into dictionary for a given time step'''
-		element_values = {}
-		element_ids = set()		# Collect all unique element ids in a set
-		for node_id in collector.Ids:
-			connected_element_ids = self.mesh.NodeById(node_id).ConnectedElementIds
-			element_ids.update(id for id in connected_element_ids)
-		if self.analysis_type.analysis == "Harmonic":
-			reader = self.analysis.GetResultsData()
-			reader.CurrentResultSet = time	# Real result set
-			stress = reader.GetResult(result_name)
-			for element_id in element_ids:
-				element_value = stress.GetElementValues(element_id)
-				element_values.update({element_id: [element_value]})
-			reader = self.analysis.GetResultsData()
-			reader.CurrentResultSet = time + 1	# Imaginary result set
-			stress = reader.GetResult(result_name)
-			for element_id in element_ids:
-				element_value = stress.GetElementValues(element_id)
-				element_values[element_id].Add(element_value)
+	def get_reader_pool(self, eval_time):
+		'''Keeps the reader pool for the following steps of a time-history run.  Any other evaluation 
+			starts with a new pool.'''
+		if self.scheduler is not None:
+			return self.scheduler.reader_pool
+		pool = self.reader_pool
+		if (pool is None or not self.result.CalculateTimeHistory or pool.analysis.WorkingDir != self.analysis.WorkingDir 
+				or pool.last_set is None or eval_time <= pool.last_set):
+			if pool is not None:
+				pool.close()
+			pool = ReaderPool(self.analysis)
+		return pool
+		
+	def release_reader_pool(self):
+		'''Closes the reader pool unless the following steps of a time-history run will read through it'''
+		pool = self.reader_pool
+		if pool is None or pool.reader is None:
+			return
+		if self.result.CalculateTimeHistory and pool.last_set is not None and pool.last_set < pool.get_result_set_count():
+			return
+		pool.close()
+		
+	def get_scoping(self, continued_run):
+		'''Resolves the scoped reference ids to a deduplicated node index.  The index is shared by all results of a 
+			scheduled pass and by the following steps of a time-history run (continued_run); any other evaluation 
+			resolves the scoping again, since the mesh may have changed.'''
+		key = (self.analysis_type.selection, tuple(self.ref_ids))
+		if self.scheduler is not None:
+			if key not in self.scheduler.scopings:
+				self.scheduler.scopings[key] = ScopingIndex(self.mesh, self.ref_ids, self.analysis_type.selection)
+			return self.scheduler.scopings[key]
+		if continued_run and self.scoping is not None and self.scoping.get_key() == key:
+			return self.scoping
+		return ScopingIndex(self.mesh, self.ref_ids, self.analysis_type.selection)
+		
+	def get_element_values(self, eval_time):
+		'''Returns the element corner node stresses needed for the time step and, with a static prestress, those of the 
+			prestress time.  All result sets are read through the reader pool in one pass.'''
+		element_ids = self.scoping.element_ids
+		pool = self.reader_pool
+		if self.analysis_type.analysis == "Static":
+			eval_key = pool.request(eval_time, "S", element_ids)
+			if self.analysis_type.prestress == "Yes":
+				prestress_key = pool.request(self.input["Prestress Time"], "S", element_ids)
+		elif self.analysis_type.analysis == "Spectrum":
+			eval_key = pool.request(2, "SPSD", element_ids)
+		elif self.analysis_type.analysis == "Harmonic":
+			eval_key = pool.request(eval_time, "S", element_ids)			# Real result set
+			imag_key = pool.request(eval_time + 1, "S", element_ids)	# Imaginary result set
+		if self.input["Storage"] == "Double Precision":
+			element_values = pool.read()
 		else:
-			reader = self.analysis.GetResultsData()
-			reader.CurrentResultSet = time
-			stress = reader.GetResult(result_name)
-			for element_id in element_ids:
-				element_value = stress.GetElementValues(element_id)
-				element_values.update({element_id: element_value})
-		return element_values
+			element_values = pool.read('f')
+		eval_element_stresses = element_values[eval_key]
+		prestress_element_stresses = None
+		if self.analysis_type.analysis == "Static" and self.analysis_type.prestress == "Yes":
+			prestress_element_stresses = element_values[prestress_key]
+		elif self.analysis_type.analysis == "Harmonic":
+			imag_element_stresses = element_values[imag_key]
+			eval_element_stresses = dict((element_id, [element_value, imag_element_stresses[element_id]]) 
+											for element_id, element_value in eval_element_stresses.items())
+		return eval_element_stresses, prestress_element_stresses
 		
 	def get_stress_conv_factor(self):
-		'''Gets the conversion factor from the current unit system to SI units'''
-		reader = self.analysis.GetResultsData()
-		reader.CurrentResultSet = 1
-		stress = reader.GetResult("S")
-		unit_stress = stress.GetComponentInfo('X').Unit
-		return ConvertUnit(1., unit_stress, "Pa", "Stress") 
+		'''Gets the conversion factor from the stress unit of the result file to SI units.  The result file is only 
+			read the first time the factor is needed for a solve, so re-solving in another unit system reads it again.  
+			Without a modification time to tell the solves apart, the factor is read every time.'''
+		key = self.get_result_file_key()
+		if key in stress_conv_factors:
+			return stress_conv_factors[key]
+		from units import ConvertUnit
+		unit_stress = self.reader_pool.get_unit("S", 'X')
+		stress_conv_factor = ConvertUnit(1., unit_stress, "Pa", "Stress")
+		if key[1] is not None:
+			stress_conv_factors[key] = stress_conv_factor
+		return stress_conv_factor
 		
 	### FatigueAnalysis Section 2: These methods define different result evaluations
 	
 	def evaluate_uniaxial_stress(self, result, stepInfo, collector):
-		'''Defines stress evaluation function and passes it to general evaluate function'''
-		def uniaxial_stress_function(mat_props, eval_node_tensor=None, prestress_node_tensor=None, eval_stress=None):
-			if self.analysis_type.analysis == "Static" or self.analysis_type.analysis == "Harmonic":
-				fully_reversed_stress, alternating_stress, mean_stress = self.get_uniaxial_fully_reversed_stress(mat_props, eval_node_tensor, prestress_node_tensor)
-			elif self.analysis_type.analysis == "Spectrum":
-				fully_reversed_stress, alternating_stress, mean_stress = self.get_uniaxial_fully_reversed_stress(mat_props, eval_stress=eval_stress)
+		'''Passes the uniaxial stress function to the general evaluate function'''
+		self.get_analysis_type(result, stepInfo.Set, stress_state="Uniaxial", output="Stress")
+		self.evaluate(result, stepInfo, collector, self.uniaxial_stress_function)
+		
+	def evaluate_uniaxial_life(self, result, stepInfo, collector):
+		'''Passes the uniaxial life function to the general evaluate function'''
+		self.get_analysis_type(result, stepInfo.Set, stress_state="Uniaxial", output="Life")
+		self.evaluate(result, stepInfo, collector, self.uniaxial_life_function)
+		
+	def evaluate_uniaxial_safety_factor(self, result, stepInfo, collector):
+		'''Passes the uniaxial safety factor function to the general evaluate function'''
+		self.get_analysis_type(result, stepInfo.Set, stress_state="Uniaxial", output="Safety Factor")
+		self.evaluate(result, stepInfo, collector, self.uniaxial_safety_factor_function)
+		
+	def get_node_function(self, output):
+		'''Returns the node evaluation function of the given output'''
+		if output == "Stress":
+			return self.uniaxial_stress_function
+		elif output == "Safety Factor":
+			return self.uniaxial_safety_factor_function
+		else:
+			return self.uniaxial_life_function
+		
+	def uniaxial_stress_function(self, mat_props, eval_node_stress, prestress_node_stress=None):
+		'''Calculates the fully-reversed stress result of one node'''
+		if self.analysis_type.analysis == "Static" or self.analysis_type.analysis == "Harmonic":
+			fully_reversed_stress, alternating_stress, mean_stress = self.get_uniaxial_fully_reversed_stress(mat_props, eval_node_stress, prestress_node_stress)
+		elif self.analysis_type.analysis == "Spectrum":
+			fully_reversed_stress, alternating_stress, mean_stress = self.get_uniaxial_fully_reversed_stress(mat_props, eval_stress=eval_node_stress)
+			scale = self.input["Scale Factor"]
+			fully_reversed_stress *= scale
+			alternating_stress *= scale
+		result_table = {"Alternating Stress": alternating_stress, 'Mean Stress': mean_stress, 'Fully-Reversed Stress': fully_reversed_stress}
+		self.result_manager.update_result(result_table)
+		return fully_reversed_stress * self.stress_conv_factor
+		
+	def uniaxial_safety_factor_function(self, mat_props, node_ids):
+		'''Calculates the safety factor result of a group of nodes sharing material properties: the multiplier on all 
+			stresses (including the prestress) that brings each node to the allowable stress at the design life'''
+		alt_stresses, mean_stresses, reversed_stresses = [], [], []
+		for node_id in node_ids:
+			eval_node_stress = self.eval_node_stresses[node_id]
+			if self.analysis_type.analysis == "Spectrum":
+				fully_reversed_stress, alternating_stress, mean_stress = self.get_uniaxial_fully_reversed_stress(mat_props, eval_stress=eval_node_stress)
 				scale = self.input["Scale Factor"]
 				fully_reversed_stress *= scale
 				alternating_stress *= scale
-			result_table = {"Alternating Stress": alternating_stress, 'Mean Stress': mean_stress, 'Fully-Reversed Stress': fully_reversed_stress}
+				mean_stress *= scale
+			elif self.prestress_node_stresses is None:
+				fully_reversed_stress, alternating_stress, mean_stress = self.get_uniaxial_fully_reversed_stress(mat_props, eval_node_stress)
+			else:
+				fully_reversed_stress, alternating_stress, mean_stress = self.get_uniaxial_fully_reversed_stress(mat_props, eval_node_stress, 
+																												self.prestress_node_stresses[node_id])
+			alt_stresses.append(alternating_stress)
+			mean_stresses.append(mean_stress)
+			reversed_stresses.append(fully_reversed_stress)
+		design_life = self.input["Design Life"]
+		allowable_stress = self.get_allowable_stress(mat_props, design_life) / self.stress_conv_factor
+		safety_factors = self.get_safety_factors(mat_props, alt_stresses, mean_stresses, allowable_stress)
+		for alternating_stress, mean_stress, fully_reversed_stress, safety_factor in zip(alt_stresses, mean_stresses, reversed_stresses, safety_factors):
+			result_table = {'Alternating Stress': alternating_stress, 'Mean Stress': mean_stress, 'Fully-Reversed Stress': fully_reversed_stress, 
+							'Allowable Stress': allowable_stress, 'Design Life': design_life, 'Safety Factor': safety_factor}
 			self.result_manager.update_result(result_table)
-			return fully_reversed_stress * self.stress_conv_factor
-		self.get_analysis_type(result, stepInfo, stress_state="Uniaxial", output="Stress")
-		self.evaluate(result, stepInfo, collector, uniaxial_stress_function)
+		return safety_factors
 		
-	def evaluate_uniaxial_life(self, result, stepInfo, collector):
-		'''Defines life evaluation function and passes it to general evaluate function'''
-		def uniaxial_life_function(mat_props, eval_node_tensor=None, prestress_node_tensor=None, eval_stress=None):
-			if self.analysis_type.analysis == "Static" or self.analysis_type.analysis == "Harmonic":
-				fully_reversed_stress, alternating_stress, mean_stress = self.get_uniaxial_fully_reversed_stress(mat_props, eval_node_tensor, prestress_node_tensor)
-				cycles_to_failure = self.get_cycles_to_failure(mat_props, fully_reversed_stress * self.stress_conv_factor)
-				if self.analysis_type.result_type == "Damage - Constant":
-					cycles = self.input["Cycles"]
-					allowable_stress = self.get_allowable_stress(mat_props, cycles) / self.stress_conv_factor
-					result = cycles / cycles_to_failure
-					result_table = {'Applied Cycles': cycles, 'Cycles to Failure': cycles_to_failure, 'Miner Sum': result, 'Allowable Stress': allowable_stress,
-									'Alternating Stress': alternating_stress, 'Mean Stress': mean_stress, 'Fully-Reversed Stress': fully_reversed_stress}
-				else:
-					result = cycles_to_failure
-					result_table = {'Cycles to Failure': result, 'Alternating Stress': alternating_stress, 'Mean Stress': mean_stress, 
-									'Fully-Reversed Stress': fully_reversed_stress}
-			elif self.analysis_type.analysis == "Spectrum":
-				if self.analysis_type.result_type == "Damage - Random":
-					reversed_stress1, alt_stress1, mean_stress1 = self.get_uniaxial_fully_reversed_stress(mat_props, eval_stress=eval_stress)
-					reversed_stress2, alt_stress2, mean_stress2 = self.get_uniaxial_fully_reversed_stress(mat_props, eval_stress=2*eval_stress)
-					reversed_stress3, alt_stress3, mean_stress3 = self.get_uniaxial_fully_reversed_stress(mat_props, eval_stress=3*eval_stress)
-					cycles_to_failure1 = self.get_cycles_to_failure(mat_props, reversed_stress1 * self.stress_conv_factor)
-					cycles_to_failure2 = self.get_cycles_to_failure(mat_props, reversed_stress2 * self.stress_conv_factor)
-					cycles_to_failure3 = self.get_cycles_to_failure(mat_props, reversed_stress3 * self.stress_conv_factor)
-					total_test_cycles = self.input["Cycles"]
-					cycles1 = total_test_cycles * 0.683
-					cycles2 = total_test_cycles * 0.271
-					cycles3 = total_test_cycles * 0.0433
-					damage1 = cycles1 / cycles_to_failure1
-					damage2 = cycles2 / cycles_to_failure2
-					damage3 = cycles3 / cycles_to_failure3
-					result = damage1 + damage2 + damage3
-					result_table = [{'Stress Level': 1, 'Alternating Stress': alt_stress1, 'Mean Stress': mean_stress1, 'Fully-Reversed Stress': reversed_stress1, 
-									'Cycle Percentage': 68.3, 'Applied Cycles': cycles1, 'Cycles to Failure': cycles_to_failure1, 'Damage': damage1},
-									{'Stress Level': 2, 'Alternating Stress': alt_stress2, 'Mean Stress': mean_stress2, 'Fully-Reversed Stress': reversed_stress2, 
-									'Cycle Percentage': 27.1, 'Applied Cycles': cycles2, 'Cycles to Failure': cycles_to_failure2, 'Damage': damage2}, 
-									{'Stress Level': 3, 'Alternating Stress': alt_stress3, 'Mean Stress': mean_stress3, 'Fully-Reversed Stress': reversed_stress3, 
-									'Cycle Percentage': 4.33, 'Applied Cycles': cycles3, 'Cycles to Failure': cycles_to_failure3, 'Damage': damage3}, 
-									{'Miner Sum': result}]
-				else:
-					fully_reversed_stress, alternating_stress, mean_stress = self.get_uniaxial_fully_reversed_stress(mat_props, eval_stress=eval_stress)
-					scale = self.input["Scale Factor"]
-					fully_reversed_stress *= scale
-					alternating_stress *= scale
-					mean_stress *= scale
-					result = self.get_cycles_to_failure(mat_props, fully_reversed_stress * self.stress_conv_factor)
-					result_table = {'Cycles to Failure': result, 'Alternating Stress': alternating_stress, 'Mean Stress': mean_stress, 
-									'Fully-Reversed Stress': fully_reversed_stress}
-			self.result_manager.update_result(result_table)
-			return result
-		self.get_analysis_type(result, stepInfo, stress_state="Uniaxial", output="Life")
-		self.evaluate(result, stepInfo, collector, uniaxial_life_function)	
+	def get_safety_factors(self, mat_props, alt_stresses, mean_stresses, allowable_stress):
+		'''Inverts the selected mean stress theory in closed form for the load multipliers of all given stress pairs'''
+		theory = self.input["Mean Stress Theory"]
+		return get_load_multipliers(theory, alt_stresses, mean_stresses, allowable_stress, mat_props["Ftu"])
+		
+	def uniaxial_life_function(self, mat_props, eval_node_stress, prestress_node_stress=None):
+		'''Calculates the life result of one node'''
+		if self.analysis_type.analysis == "Static" or self.analysis_type.analysis == "Harmonic":
+			fully_reversed_stress, alternating_stress, mean_stress = self.get_uniaxial_fully_reversed_stress(mat_props, eval_node_stress, prestress_node_stress)
+			cycles_to_failure = self.get_cycles_to_failure(mat_props, fully_reversed_stress * self.stress_conv_factor)
+			if self.analysis_type.result_type == "Damage - Constant":
+				cycles = self.input["Cycles"]
+				allowable_stress = self.get_allowable_stress(mat_props, cycles) / self.stress_conv_factor
+				result = cycles / cycles_to_failure
+				result_table = {'Applied Cycles': cycles, 'Cycles to Failure': cycles_to_failure, 'Miner Sum': result, 'Allowable Stress': allowable_stress,
+								'Alternating Stress': alternating_stress, 'Mean Stress': mean_stress, 'Fully-Reversed Stress': fully_reversed_stress}
+			else:
+				result = cycles_to_failure
+				result_table = {'Cycles to Failure': result, 'Alternating Stress': alternating_stress, 'Mean Stress': mean_stress, 
+								'Fully-Reversed Stress': fully_reversed_stress}
+		elif self.analysis_type.analysis == "Spectrum":
+			if self.analysis_type.result_type == "Damage - Random":
+				reversed_stress1, alt_stress1, mean_stress1 = self.get_uniaxial_fully_reversed_stress(mat_props, eval_stress=eval_node_stress)
+				reversed_stress2, alt_stress2, mean_stress2 = self.get_uniaxial_fully_reversed_stress(mat_props, eval_stress=2*eval_node_stress)
+				reversed_stress3, alt_stress3, mean_stress3 = self.get_uniaxial_fully_reversed_stress(mat_props, eval_stress=3*eval_node_stress)
+				cycles_to_failure1 = self.get_cycles_to_failure(mat_props, reversed_stress1 * self.stress_conv_factor)
+				cycles_to_failure2 = self.get_cycles_to_failure(mat_props, reversed_stress2 * self.stress_conv_factor)
+				cycles_to_failure3 = self.get_cycles_to_failure(mat_props, reversed_stress3 * self.stress_conv_factor)
+				total_test_cycles = self.input["Cycles"]
+				cycles1 = total_test_cycles * 0.683
+				cycles2 = total_test_cycles * 0.271
+				cycles3 = total_test_cycles * 0.0433
+				damage1 = cycles1 / cycles_to_failure1
+				damage2 = cycles2 / cycles_to_failure2
+				damage3 = cycles3 / cycles_to_failure3
+				result = damage1 + damage2 + damage3
+				result_table = [{'Stress Level': 1, 'Alternating Stress': alt_stress1, 'Mean Stress': mean_stress1, 'Fully-Reversed Stress': reversed_stress1, 
+								'Cycle Percentage': 68.3, 'Applied Cycles': cycles1, 'Cycles to Failure': cycles_to_failure1, 'Damage': damage1},
+								{'Stress Level': 2, 'Alternating Stress': alt_stress2, 'Mean Stress': mean_stress2, 'Fully-Reversed Stress': reversed_stress2, 
+								'Cycle Percentage': 27.1, 'Applied Cycles': cycles2, 'Cycles to Failure': cycles_to_failure2, 'Damage': damage2}, 
+								{'Stress Level': 3, 'Alternating Stress': alt_stress3, 'Mean Stress': mean_stress3, 'Fully-Reversed Stress': reversed_stress3, 
+								'Cycle Percentage': 4.33, 'Applied Cycles': cycles3, 'Cycles to Failure': cycles_to_failure3, 'Damage': damage3}, 
+								{'Miner Sum': result}]
+			else:
+				fully_reversed_stress, alternating_stress, mean_stress = self.get_uniaxial_fully_reversed_stress(mat_props, eval_stress=eval_node_stress)
+				scale = self.input["Scale Factor"]
+				fully_reversed_stress *= scale
+				alternating_stress *= scale
+				mean_stress *= scale
+				result = self.get_cycles_to_failure(mat_props, fully_reversed_stress * self.stress_conv_factor)
+				result_table = {'Cycles to Failure': result, 'Alternating Stress': alternating_stress, 'Mean Stress': mean_stress, 
+								'Fully-Reversed Stress': fully_reversed_stress}
+		self.result_manager.update_result(result_table)
+		return result
 		
 	def evaluate(self, result, stepInfo, collector, func):
-		'''General evaluation function for all result types.  The particular result is defined by the "func" passed to it.'''
+		'''General evaluation function for all result types.  The particular result is defined by the "func" passed to it.  
+			During an Evaluate All Fatigue pass, the result shares the reader, scoping, extractions and material lookups 
+			of the pass.'''
 		eval_time = stepInfo.Set
-		ExtAPI.Log.WriteMessage("Reinitializing variables for step "+str(eval_time)+"..."+str(datetime.time(datetime.now())))
-		self.reinit(result, collector, eval_time)
-		ExtAPI.Log.WriteMessage("Evaluating stresses..."+str(datetime.time(datetime.now())))
-		# Extract all node ids and materal properties
-		ref_data = {}
-		for ref_id in self.ref_ids:
-			mat_props = self.get_material_props(ref_id)
-			if self.analysis_type.selection == "Geometric Entity":
-				node_ids = self.mesh.MeshRegionById(ref_id).NodeIds
+		self.scheduler = scheduled_passes.get(result.Analysis.WorkingDir)
+		try:
+			ExtAPI.Log.WriteMessage("Reinitializing variables for step "+str(eval_time)+"..."+str(datetime.time(datetime.now())))
+			self.reinit(result, eval_time)
+			ExtAPI.Log.WriteMessage("Evaluating stresses..."+str(datetime.time(datetime.now())))
+			# Calculate result at all nodes, then set corresponding node value in collector.
+			node_results, restored = self.get_step_node_results(func, eval_time)
+			self.store_step(node_results, restored)
+		finally:
+			# The reader of a scheduled pass is closed when the pass ends
+			if self.scheduler is None:
+				self.release_reader_pool()
+			self.scheduler = None
+		for node_id, node_result in node_results.items():
+			collector.SetValues(node_id, [node_result])
+		ExtAPI.Log.WriteMessage("Finished evaluation..."+str(datetime.time(datetime.now())))
+		if result.Analysis.WorkingDir not in scheduled_passes:
+			ExtAPI.Log.WriteMessage(self.scoping.summary())
+			ExtAPI.Log.WriteMessage(self.reader_pool.summary())
+		
+	def get_step_node_results(self, func, eval_time):
+		'''Calculates the node results of a time step.  A time-history run interrupted by a crash or cancel resumes from 
+			its result checkpoint: the steps it completed with the same input are restored.  Also returns whether the 
+			step was restored.'''
+		self.checkpoint = self.get_checkpoint()
+		time_step = self.result_manager.time_step
+		if self.checkpoint is not None and self.checkpoint.has_step(time_step):
+			ExtAPI.Log.WriteMessage("Restoring step "+str(time_step)+" from checkpoint..."+str(datetime.time(datetime.now())))
+			if self.scheduler is not None:
+				self.scheduler.results_restored += 1
+			self.result_manager.running_table = self.checkpoint.get_running_table(time_step)
+			return self.checkpoint.get_node_results(time_step), True
+		self.extract_node_stresses(eval_time)
+		node_results = self.get_node_results(func)
+		if self.scheduler is not None:
+			self.scheduler.results_evaluated += 1
+		if self.input["Storage"] == "Single Precision (Validate)":
+			self.validate_storage(func, node_results, eval_time)
+		return node_results, False
+		
+	def get_checkpoint(self):
+		'''Returns the checkpoint of a time-history run, keeping it open while the signature of the result stays the same 
+			(for the following steps of the run).  Other results have none.  Without a modification time of the result 
+			file, an interrupted run cannot be told apart from a new solve, so a new checkpoint is started.  The csv 
+			file of a resumed run is printed again from the checkpoint.'''
+		if not self.result.CalculateTimeHistory:
+			return None
+		signature = self.get_checkpoint_signature()
+		if self.checkpoint is not None and self.checkpoint.signature == signature:
+			return self.checkpoint
+		checkpoint = CheckpointManager(self.result, self.analysis_type, signature, resume=self.get_result_file_key()[1] is not None)
+		if checkpoint.count() > 0:
+			self.result_manager.restore(checkpoint)
+		return checkpoint
+		
+	def get_checkpoint_signature(self):
+		'''Identifies everything the node results of a time step depend on: the analysis, the result, its input and 
+			scoping, and the result file'''
+		return repr((self.analysis.WorkingDir, self.result.Id, self.analysis_type, sorted(self.input.items()), 
+					tuple(self.ref_ids), self.get_result_file_key()))
+		
+	def get_result_file_key(self):
+		'''Identifies one solve of the analysis by the path and modification time of its result file'''
+		result_file = os.path.join(self.analysis.WorkingDir, "file.rst")
+		if os.path.exists(result_file):
+			return (result_file, os.path.getmtime(result_file))
+		return (result_file, None)
+		
+	def store_step(self, node_results, restored):
+		'''Records a calculated step of a time-history run in its checkpoint before printing the worst-node table, so 
+			that a crash in between leaves no row that the checkpoint does not know of.  Restored steps are already 
+			printed.  The checkpoint of a finished run is removed, so that evaluating the result again starts over.  
+			Other results print a new csv file.'''
+		if self.checkpoint is None:
+			self.result_manager.store(new_file=True)
+			return
+		if not restored:
+			self.checkpoint.add(self.result_manager.time_step, node_results, self.result_manager.running_table)
+			self.result_manager.store(new_file=self.checkpoint.count() == 1)
+		if self.is_last_step():
+			self.checkpoint.remove()
+			self.checkpoint = None
+			
+	def is_last_step(self):
+		'''Whether the time step is the last result set of the run (the real set of the last real and imaginary pair 
+			of a harmonic analysis)'''
+		last_set = self.reader_pool.get_result_set_count()
+		if self.analysis_type.analysis == "Harmonic":
+			last_set -= 1
+		return self.result_manager.time_step >= last_set
+		
+	def evaluate_sweep(self, result, result_set, output, parameter_grid):
+		'''Evaluates the result at the given result set for every combination of the parameters in parameter_grid, a 
+			dictionary mapping get_input names (e.g. "Mean Stress Theory", "Kt", "Temperature Factor") to lists of values.  
+			Stresses are extracted, averaged and reduced to principal stresses once and shared by all combinations.  The 
+			worst node of every combination is written to a sweep table in the analysis working directory.  Names that 
+			are not inputs of the result, that are fixed at extraction (e.g. "Prestress Time") or that decide which other 
+			inputs the result has ("Multiaxial Stress Theory") raise a ValueError.'''
+		eval_time = result_set
+		self.get_analysis_type(result, eval_time, stress_state=self.stress_state, output=output)
+		func = self.get_node_function(output)
+		ExtAPI.Log.WriteMessage("Reinitializing variables for sweep..."+str(datetime.time(datetime.now())))
+		self.reinit(result, eval_time)
+		parameter_names = list(parameter_grid.keys())
+		self.check_input_names(parameter_names)
+		self.extract_node_stresses(eval_time)
+		self.reader_pool.close()
+		sweep_manager = SweepManager(result, self.analysis_type, parameter_names)
+		for values, _ in self.get_sweep_node_results(func, parameter_names, parameter_grid, eval_time):
+			sweep_manager.add(values, self.result_manager)
+		ExtAPI.Log.WriteMessage("Finished sweep of "+str(sweep_manager.count())+" combinations..."+str(datetime.time(datetime.now())))
+		sweep_manager.store()
+		
+	def get_sweep_node_results(self, func, parameter_names, parameter_grid, eval_time):
+		'''Yields the parameter values and node results of every combination of the parameter grid, evaluated on the 
+			already extracted node stresses.  The result manager of each combination is current while it is yielded.'''
+		base_input = self.input
+		try:
+			for values in product(*[parameter_grid[name] for name in parameter_names]):
+				self.input = dict(base_input)
+				self.input.update(zip(parameter_names, values))
+				self.result_manager = ResultManager(self.result, self.analysis_type, eval_time)
+				self.update_material_props()
+				yield values, self.get_node_results(func)
+		finally:
+			self.input = base_input
+		
+	def check_input_names(self, names):
+		'''Checks that every input varied by a sweep or reliability evaluation exists for the result and is applied after 
+			the stresses are extracted, so that no combination silently repeats the base result'''
+		for name in names:
+			if name not in self.input:
+				raise ValueError('"' + name + '" is not an input of ' + self.stress_state + " " + self.analysis_type.result_type + 
+									' results (inputs: ' + ", ".join(sorted(self.input.keys())) + ')')
+			if name in self.extraction_inputs:
+				raise ValueError('"' + name + '" is fixed when the stresses are extracted and cannot be varied')
+			if name in self.selector_inputs:
+				raise ValueError('"' + name + '" decides which other inputs the result has and cannot be varied')
+		
+	def evaluate_reliability(self, result, result_set, distributions, samples=1000, target_life=None, percentiles=(1., 10., 50.), 
+								screen_factor=10., block_size=500, seed=None):
+		'''Monte Carlo reliability evaluation of a life result at the given result set.  distributions maps get_input names (e.g. "Scatter Factor (Stress)", 
+			"Scatter Factor (Life)", "Temperature Factor", "Kt", "Notch Radius") to distributions accepted by draw_sample.  Every 
+			sample gets its own S-N data and notch sensitivity.  Only nodes whose nominal life is below screen_factor times the 
+			target life are sampled, in blocks of block_size nodes so that at most block_size x samples lives are held at once.  
+			The failure probability (life below target) and percentile lives of every screened node are written to a table.  
+			target_life defaults to the number of cycles of Miner sum results and is required for Cycles to Failure results.'''
+		eval_time = result_set
+		self.get_analysis_type(result, eval_time, stress_state=self.stress_state, output="Life")
+		func = self.get_node_function("Life")
+		ExtAPI.Log.WriteMessage("Reinitializing variables for reliability evaluation..."+str(datetime.time(datetime.now())))
+		self.reinit(result, eval_time)
+		self.check_input_names(distributions.keys())
+		base_input = self.input
+		if target_life is None:
+			if "Cycles" not in base_input:
+				raise ValueError("target_life is required for " + self.analysis_type.result_type + " results, which have no number of cycles")
+			target_life = base_input["Cycles"]
+		self.extract_node_stresses(eval_time)
+		self.reader_pool.close()
+		# Screen out nodes that cannot reach the target life with any reasonable input scatter
+		screened_nodes = []
+		for ref_id, (mat_props, node_ids) in self.ref_data.items():
+			for node_id in node_ids:
+				if self.get_life(self.evaluate_node(func, mat_props, node_id)) < screen_factor * target_life:
+					screened_nodes.append((ref_id, node_id))
+		ExtAPI.Log.WriteMessage("Sampling "+str(len(screened_nodes))+" screened nodes with "+str(samples)+" samples..."+str(datetime.time(datetime.now())))
+		# Material properties of every sample are shared by all nodes
+		rng = Random(seed)
+		sample_inputs, sample_mat_props = [], []
+		for k in range(samples):
+			sample_input = dict(base_input)
+			for name, distribution in distributions.items():
+				sample_input.update({name: draw_sample(rng, distribution)})
+			self.input = sample_input
+			sample_inputs.append(sample_input)
+			sample_mat_props.append(dict((ref_id, self.get_material_props(ref_id)) for ref_id in self.ref_data))
+		reliability_manager = ReliabilityManager(result, self.analysis_type, target_life, percentiles)
+		for start in range(0, len(screened_nodes), block_size):
+			block = screened_nodes[start:start+block_size]
+			lives = [[] for _ in block]
+			for sample_input, mat_props_by_ref in zip(sample_inputs, sample_mat_props):
+				self.input = sample_input
+				for node_lives, (ref_id, node_id) in zip(lives, block):
+					node_lives.append(self.get_life(self.evaluate_node(func, mat_props_by_ref[ref_id], node_id)))
+			for node_lives, (_, node_id) in zip(lives, block):
+				node_lives.sort()
+				failure_probability = sum(1 for life in node_lives if life < target_life) / float(samples)
+				reliability_manager.add(node_id, failure_probability, [percentile(node_lives, p) for p in percentiles])
+		self.input = base_input
+		ExtAPI.Log.WriteMessage("Finished reliability evaluation..."+str(datetime.time(datetime.now())))
+		reliability_manager.store()
+		
+	def get_life(self, node_result):
+		'''Converts a life node result (cycles to failure or Miner sum) to cycles to failure'''
+		if self.analysis_type.result_type == "Cycles to Failure":
+			return node_result
+		else:
+			return self.input["Cycles"] / node_result
+		
+	def extract_node_stresses(self, eval_time):
+		'''Reads the element stresses of the scoped geometry, averages them at every node and collects the material 
+			properties of every reference id.  During a scheduled pass, results with the same sets and scoping share 
+			one extraction.  Time-history results do not, since the stresses of every result set would be held until 
+			the pass ends.'''
+		# Extract the nodes owned by every reference id and their materal properties
+		self.ref_data = OrderedDict()
+		for ref_id, node_ids in self.scoping.ref_node_ids.items():
+			self.ref_data.update({ref_id: [None, node_ids]})
+		key = self.get_extraction_key(eval_time)
+		shared = self.scheduler is not None and not self.result.CalculateTimeHistory
+		if shared and key in self.scheduler.extractions:
+			eval_node_stresses, prestress_node_stresses = self.scheduler.extractions[key]
+			self.scheduler.extraction_hits += 1
+		else:
+			eval_element_stresses, prestress_element_stresses = self.get_element_values(eval_time)
+			# Determine average stresses at each node, dropping the element stresses as soon as they are averaged
+			eval_node_stresses = self.get_average_node_stresses(eval_element_stresses, self.scoping)
+			del eval_element_stresses
+			if prestress_element_stresses is not None:
+				prestress_node_stresses = self.get_average_node_stresses(prestress_element_stresses, self.scoping)
 			else:
-				node_ids = [ref_id]
-			ref_data.update({ref_id: [mat_props, node_ids]})
-		# Determine average stresses at each node
-		eval_node_stresses = self.get_average_node_stresses(self.eval_element_stresses, ref_data)
+				prestress_node_stresses = None
+			del prestress_element_stresses
+			if shared:
+				self.scheduler.extractions[key] = (eval_node_stresses, prestress_node_stresses)
+		# Uniaxial and multiaxial results share the averaged stresses, but not their principal stresses
+		prepared_key = (self.stress_state,) + key
+		if shared and prepared_key in self.scheduler.prepared_stresses:
+			self.eval_node_stresses, self.prestress_node_stresses = self.scheduler.prepared_stresses[prepared_key]
+			self.scheduler.prepared_hits += 1
+		else:
+			self.eval_node_stresses, self.prestress_node_stresses = self.prepare_node_stresses(eval_node_stresses, prestress_node_stresses)
+			if shared:
+				self.scheduler.prepared_stresses[prepared_key] = (self.eval_node_stresses, self.prestress_node_stresses)
+		self.stress_conv_factor = self.get_stress_conv_factor()
+		self.update_material_props()
+		
+	def get_extraction_key(self, eval_time):
+		'''Identifies everything the extracted node stresses depend on'''
 		if self.analysis_type.analysis == "Static" and self.analysis_type.prestress == "Yes":
-			prestress_node_stresses = self.get_average_node_stresses(self.prestress_element_stresses, ref_data)
-		# Loop through all nodes and calculate result, then set corresponding node value in collector.
-		for mat_props, node_ids in ref_data.values():	
-			for node_id in node_ids:
-				eval_node_stress = eval_node_stresses[node_id]
-				if self.analysis_type.prestress == "Yes":
-					prestress_node_stress = prestress_node_stresses[node_id]
-					node_result = func(mat_props, eval_node_stress, prestress_node_stress)
-				else:
-					if self.analysis_type.analysis == "Spectrum":
-						node_result = func(mat_props, eval_stress=eval_node_stress)
-					else:
-						node_result = func(mat_props, eval_node_stress)
-				collector.SetValues(node_id, [node_result])
-		ExtAPI.Log.WriteMessage("Finished evaluation..."+str(datetime.time(datetime.now())))
-		self.result_manager.store()
+			prestress_time = self.input["Prestress Time"]
+		else:
+			prestress_time = None
+		compact = self.input["Storage"] != "Double Precision"
+		return (self.analysis_type.analysis, self.analysis_type.selection, eval_time, prestress_time, tuple(self.ref_ids), compact)
+		
+	def new_node_values(self, width=None):
+		'''Returns an empty store for one value (width None) or width values per scoped node: a dictionary, or a 
+			preallocated single-precision array when compact storage is selected.  Interpolation and mean stress 
+			calculations still work in double precision on the values read back.'''
+		if self.input["Storage"] == "Double Precision":
+			return {}
+		return NodeArray(self.scoping.rows, width)
+		
+	def validate_storage(self, func, node_results, eval_time):
+		'''Evaluates the result again with double-precision storage and logs the largest relative errors of the 
+			single-precision node stresses and node results against it'''
+		compact_input, compact_manager, scheduler = self.input, self.result_manager, self.scheduler
+		compact_stresses = (self.eval_node_stresses, self.prestress_node_stresses)
+		self.input = dict(compact_input)
+		self.input.update({"Storage": "Double Precision"})
+		self.result_manager = ResultManager(self.result, self.analysis_type, eval_time)
+		self.scheduler = None
+		try:
+			self.extract_node_stresses(eval_time)
+			exact_node_results = self.get_node_results(func)
+			stress_error = max_relative_error(compact_stresses[0], self.eval_node_stresses)
+			if compact_stresses[1] is not None:
+				stress_error = max(stress_error, max_relative_error(compact_stresses[1], self.prestress_node_stresses))
+			result_error = max_relative_error(node_results, exact_node_results)
+		finally:
+			self.input, self.result_manager, self.scheduler = compact_input, compact_manager, scheduler
+			self.eval_node_stresses, self.prestress_node_stresses = compact_stresses
+		ExtAPI.Log.WriteMessage("Storage validation: maximum relative error " + str(stress_error) + " in node stresses, " + 
+								str(result_error) + " in " + self.analysis_type.output.lower() + " results")
+		
+	def update_material_props(self):
+		'''Looks up the material properties of every scoped reference id for the current input'''
+		for ref_id in self.ref_data:
+			self.ref_data[ref_id][0] = self.get_material_props(ref_id)
+		
+	def get_node_results(self, func):
+		'''Loops through all nodes and calculates their result with the node function "func"'''
+		node_results = OrderedDict()
+		for mat_props, node_ids in self.ref_data.values():	
+			if self.analysis_type.result_type == "Safety Factor":
+				# Safety factors are solved for all nodes of a reference id together
+				node_results.update(zip(node_ids, func(mat_props, node_ids)))
+			else:
+				for node_id in node_ids:
+					node_results[node_id] = self.evaluate_node(func, mat_props, node_id)
+		return node_results
+		
+	def evaluate_node(self, func, mat_props, node_id):
+		'''Calculates the result of a single node with the node function "func"'''
+		if self.prestress_node_stresses is None:
+			return func(mat_props, self.eval_node_stresses[node_id])
+		else:
+			return func(mat_props, self.eval_node_stresses[node_id], self.prestress_node_stresses[node_id])
 	
-	def get_average_node_stresses(self, element_stresses, ref_data):
-		'''Creates dictionary of average stresses at every node.  Performs stress averaging across corner nodes, then 
-			interpolates the averaged corner node stresses at the midside nodes.'''
+	def get_average_node_stresses(self, element_stresses, scoping):
+		'''Creates dictionary of average stresses at every unique node of the scoping.  Performs stress averaging across 
+			corner nodes, then interpolates the averaged corner node stresses at the midside nodes.'''
 		def stress_init():
 			if self.analysis_type.analysis == "Spectrum":
 				return 0.
 			else:
 				return [0., 0., 0., 0., 0., 0.]
-		global link
+		link = get_link()
 		# Loop across all nodes.  If it's a corner node, determine the average stresses across all connected elements.	
 		# If it's a midside node, determine the ids of the connected corner nodes. cnid = "Corner node id".
-		node_stress_avg_map, midside_cnid_map = {}, {}
-		for _, node_ids in ref_data.values():
-			for node_id in node_ids:
-				element_ids = self.mesh.NodeById(node_id).ConnectedElementIds
-				node_stress = stress_init()
-				for element_id in element_ids:
-					element = self.mesh.ElementById(element_id)
-					cpt = element.NodeIds.IndexOf(node_id)
-					if cpt < element.CornerNodeIds.Count:	# Corner node
-						element_stress = element_stresses[element_id]
-						if self.analysis_type.analysis == "Spectrum":
-							node_stress += element_stress[cpt]
-						else:
-							if self.analysis_type.analysis == "Static":
-								for i in range(6):
-									node_stress[i] += element_stress[6*cpt+i]
-							if self.analysis_type.analysis == "Harmonic":
-								for i in range(6):
-									node_stress[i] += copysign(sqrt(element_stress[0][6*cpt+i]**2 + element_stress[1][6*cpt+i]**2), element_stress[1][6*cpt+i])
-					else:	# Midside node
-						itoadd = link[element.Type][cpt]
-						cnids = [element.NodeIds[itoadd[0]], element.NodeIds[itoadd[1]]]
-						midside_cnid_map.update({node_id: cnids})
-						break
-				else:
+		if self.analysis_type.analysis == "Spectrum":
+			node_stress_avg_map = self.new_node_values()
+		else:
+			node_stress_avg_map = self.new_node_values(6)
+		midside_cnid_map = {}
+		for node_id in scoping.get_node_ids():
+			element_ids = scoping.get_connected_element_ids(node_id)
+			node_stress = stress_init()
+			for element_id in element_ids:
+				element = scoping.get_element(element_id)
+				cpt = element.NodeIds.IndexOf(node_id)
+				if cpt < element.CornerNodeIds.Count:	# Corner node
+					element_stress = element_stresses[element_id]
 					if self.analysis_type.analysis == "Spectrum":
-						node_stress /= element_ids.Count
+						node_stress += element_stress[cpt]
 					else:
-						for i in range(6):
-							node_stress[i] /= element_ids.Count
-					node_stress_avg_map.update({node_id: node_stress})
+						if self.analysis_type.analysis == "Static":
+							for i in range(6):
+								node_stress[i] += element_stress[6*cpt+i]
+						if self.analysis_type.analysis == "Harmonic":
+							for i in range(6):
+								node_stress[i] += copysign(sqrt(element_stress[0][6*cpt+i]**2 + element_stress[1][6*cpt+i]**2), element_stress[1][6*cpt+i])
+				else:	# Midside node
+					itoadd = link[element.Type][cpt]
+					cnids = [element.NodeIds[itoadd[0]], element.NodeIds[itoadd[1]]]
+					midside_cnid_map.update({node_id: cnids})
+					break
+			else:
+				if self.analysis_type.analysis == "Spectrum":
+					node_stress /= element_ids.Count
+				else:
+					for i in range(6):
+						node_stress[i] /= element_ids.Count
+				node_stress_avg_map[node_id] = node_stress
 		# Loop through all the midside nodes and compute their average stresses using the averaged stresses at the corner nodes.
 		for midside_node_id, corner_node_ids in midside_cnid_map.items():
 			node_stress = stress_init()
@@ -428,24 +841,56 @@ class UniaxialStressLife:
 				else:
 					for i in range(6):
 						node_stress[i] += node_stress_avg_map[cnid][i] / 2
-			node_stress_avg_map.update({midside_node_id: node_stress})
+			node_stress_avg_map[midside_node_id] = node_stress
 		return node_stress_avg_map
 		
+	def prepare_node_stresses(self, eval_node_stresses, prestress_node_stresses=None):
+		'''Computes the principal stresses of all nodes in one batch so that they are shared by every evaluation 
+			of the node stresses.  Spectrum evaluations work directly on the averaged stresses.'''
+		if self.analysis_type.analysis == "Spectrum":
+			return eval_node_stresses, prestress_node_stresses
+		eval_principal_stresses = self.new_node_values(3)
+		for node_id in eval_node_stresses.keys():
+			eval_principal_stresses[node_id] = get_principal_stresses(eval_node_stresses[node_id])
+		if prestress_node_stresses is None:
+			return eval_principal_stresses, None
+		prestress_principal_stresses = self.new_node_values(3)
+		for node_id in prestress_node_stresses.keys():
+			prestress_principal_stresses[node_id] = get_principal_stresses(prestress_node_stresses[node_id])
+		return eval_principal_stresses, prestress_principal_stresses
+		
 	### FatigueAnalysis Section 3: Material property lookups
 		
 	def get_material_props(self, ref_id):
-#		'''Extract all required material properties for given geometry reference id.
-#			Inner functions help break up the work.'''
-		def get_stress_prop(material, property):
-			property_list = GetMaterialPropertyByName(material, property)
+#		'''Extract all required material properties for given geometry reference id.'''
+		from materials import GetMaterialPropertyByName
+		if self.analysis_type.selection == "Geometric Entity":
+			material = self.geo_data.GeoEntityById(ref_id).Part.Bodies[0].Material
+		else:
+			body_id = self.mesh.NodeById(ref_id).BodyIds[0]
+			material = self.geo_data.GeoEntityById(body_id).Material
+		def get_material_property(property):
+			# Material lookups do not depend on the input, so they are shared by all evaluations of a step
+			key = (material, property)
+			if key not in self.material_properties:
+				self.material_properties[key] = GetMaterialPropertyByName(material, property)
+			return self.material_properties[key]
+		length_conv_factor = SI_length_factor(str(ExtAPI.DataModel.Project.UnitSystem))
+		return self.build_material_props(get_material_property, length_conv_factor)
+		
+	def build_material_props(self, get_material_property, length_conv_factor):
+		'''Builds the material property dictionary for the current input from a material property lookup (a function 
+			returning the tables of GetMaterialPropertyByName).  Inner functions help break up the work.'''
+		def get_stress_prop(property):
+			property_list = get_material_property(property)
 			property = property_list[property][1]
 			return property
-		def get_SN_data(material):
+		def get_SN_data():
 			k_scatter_stress = self.input["Scatter Factor (Stress)"]
 			k_scatter_life = self.input["Scatter Factor (Life)"]
 			k_temperature = self.input["Temperature Factor"]
 			k_misc = self.input["Miscellaneous Factor"]
-			SN = GetMaterialPropertyByName(material, 'Alternating Stress')
+			SN = get_material_property('Alternating Stress')
 			if "R-Ratio" in SN:
 				Rdata = SN['R-Ratio'][1:]
 				Sdata = SN['Alternating Stress'][1:]
@@ -464,15 +909,13 @@ class UniaxialStressLife:
 			Ndata = [n / k_scatter_life for n in Ndata]
 			return Sdata, Ndata
 		def get_notch_sensitivity(Ftu):
-			unit_sys = str(ExtAPI.DataModel.Project.UnitSystem)
-			length_conv_factor = SI_length_factor(unit_sys)
-			r = self.input["Notch Radius"] * length_conv_factor * 25.4 / 1000 # Convert to inches
+			r = self.input["Notch Radius"] / length_conv_factor * 1000 / 25.4 # Convert to inches
 			if self.input["Notch Sensitivity Correlation"] == "Steel (Peterson)":
 				a = -2.58e-9*Ftu**3 + 1.62e-6*Ftu**2 - 3.55e-4*Ftu + 2.89e-2
 			else:
 				a = .020
 			q = 1 / (1 + a / r)
-			if self.analysis_type.result_type.split(" ")[0] == "Damage":
+			if "Cycle Sensitivity Correlation" in self.input:
 				if self.input["Cycle Sensitivity Correlation"] == "None":
 					qp = 1
 				else:
@@ -480,10 +923,14 @@ class UniaxialStressLife:
 						juvinall_factor = -5.08e-6*Ftu**2 + 4.65e-3*Ftu - .212
 					else: # Aluminum (Juvinall)
 						juvinall_factor = -4.57e-5*Ftu**2 + 1.4e-2*Ftu - .212	
-					cycles = self.input["Cycles"]
-					if cycles >= 10^6:
+					# Safety factors reduce the notch sensitivity at the design life
+					if self.analysis_type.result_type == "Safety Factor":
+						cycles = self.input["Design Life"]
+					else:
+						cycles = self.input["Cycles"]
+					if cycles >= 10**6:
 						qp = 1.0
-					elif cycles <= 10^3:
+					elif cycles <= 10**3:
 						qp = juvinall_factor
 					else:
 						# Log-log interpolate between 10^6 and 10^3
@@ -491,23 +938,18 @@ class UniaxialStressLife:
 						qp = juvinall_factor*(cycles/10**3)**m
 				q *= qp
 			mat_props.update({"Notch Sensitivity": q})
-		# Create material property dictionary and extract material from reference id
+		# Create material property dictionary
 		mat_props = {}
-		if self.analysis_type.selection == "Geometric Entity":
-			material = self.geo_data.GeoEntityById(ref_id).Part.Bodies[0].Material
-		else:
-			body_id = self.mesh.NodeById(ref_id).BodyIds[0]
-			material = self.geo_data.GeoEntityById(body_id).Material
 		# Extract properties of material
 		k_temperature = self.input["Temperature Factor"]
-		Ftu = k_temperature * get_stress_prop(material, "Tensile Ultimate Strength") / 6894760	# Convert to ksi
+		Ftu = k_temperature * get_stress_prop("Tensile Ultimate Strength") / 6894760	# Convert to ksi
 		if self.analysis_type.notched == "Notched":
 			get_notch_sensitivity(Ftu)
 		Ftu /= (self.stress_conv_factor / 6894760)
 		mat_props.update({"Ftu": Ftu})
-		if self.analysis_type.output == "Life":
-			Fty = k_temperature * get_stress_prop(material, "Tensile Yield Strength") / self.stress_conv_factor
-			Sdata, Ndata = get_SN_data(material)
+		if self.analysis_type.output != "Stress":
+			Fty = k_temperature * get_stress_prop("Tensile Yield Strength") / self.stress_conv_factor
+			Sdata, Ndata = get_SN_data()
 			mat_props.update({"Fty": Fty, "Sdata": Sdata, "Ndata": Ndata})
 		return mat_props
 		
@@ -543,10 +985,10 @@ class UniaxialStressLife:
 			
 	### FatigueAnalysis Section 4: Uniaxial stress calculations
 	
-	def get_uniaxial_fully_reversed_stress(self, mat_props, eval_node_tensor=None, prestress_node_tensor=None, eval_stress=None):
-		'''Calculates fully-reversed stress prestressd on given tensor or stress.'''
+	def get_uniaxial_fully_reversed_stress(self, mat_props, eval_principal_stresses=None, prestress_principal_stresses=None, eval_stress=None):
+		'''Calculates fully-reversed stress prestressd on given principal stresses or stress.'''
 		if eval_stress is None:
-			sa, sm = self.get_uniaxial_alt_mean_stress(eval_node_tensor, prestress_node_tensor)
+			sa, sm = self.get_uniaxial_alt_mean_stress(eval_principal_stresses, prestress_principal_stresses)
 		else:
 			sa, sm = self.get_uniaxial_alt_mean_stress(eval_stress=eval_stress)
 		if self.analysis_type.notched == "Notched":
@@ -558,13 +1000,11 @@ class UniaxialStressLife:
 		sfr = self.get_fully_reversed_stress(mat_props, sa, sm)
 		return sfr, sa, sm
 		
-	def get_uniaxial_alt_mean_stress(self, eval_node_tensor=None, prestress_node_tensor=None, eval_stress=None):
-		'''Calculates alternating and mean stress prestressd on given tensors or stresses along with load history.'''
+	def get_uniaxial_alt_mean_stress(self, eval_principal_stresses=None, prestress_principal_stresses=None, eval_stress=None):
+		'''Calculates alternating and mean stress prestressd on given principal stresses or stresses along with load history.'''
 		if eval_stress is None:
-			eval_principal_stresses = get_principal_stresses(eval_node_tensor)
 			eval_stress = get_stress_component(self.input["Stress Component"], eval_principal_stresses)
-		if prestress_node_tensor is not None:	# For static analyses
-			prestress_principal_stresses = get_principal_stresses(prestress_node_tensor)
+		if prestress_principal_stresses is not None:	# For static analyses
 			prestress_stress = get_stress_component(self.input["Stress Component"], prestress_principal_stresses)
 		else:
 			prestress_stress = 0
@@ -607,6 +1047,9 @@ class UniaxialStressLife:
 		
 class MultiaxialEquivalentStressLife(UniaxialStressLife):
 
+	stress_state = "Multiaxial"
+	selector_inputs = ("Multiaxial Stress Theory",)		# Sines results have a Sines constant, the others a mean stress theory
+
 	def get_input(self):
 		'''Multiaxial analysis collects additional user input'''
 		dict = UniaxialStressLife.get_input(self)
@@ -618,7 +1061,7 @@ class MultiaxialEquivalentStressLife(UniaxialStressLife):
 			if sines_constant_select == "User Input":
 				sines_constant = sines_constant_select = rp["Multiaxial Stress Theory"].Properties["Multiaxial Stress Theory"].Properties["Sines Constant"].Properties["Sines Constant"].Value
 			else:
-				sines_constant = float(sines_constant_select.split("=")[-1].split(")")[0])
+				sines_constant = get_sines_constant(sines_constant_select)
 			dict.update({"Sines Constant": sines_constant})
 		else:
 			mean_stress_theory = rp["Multiaxial Stress Theory"].Properties["Multiaxial Stress Theory"].Properties["Mean Stress Theory"].Value
@@ -632,36 +1075,101 @@ class MultiaxialEquivalentStressLife(UniaxialStressLife):
 			dict.update({"Kt1": Kt1, "Kt2": Kt2, "Kt3": Kt3, "Notch Sensitivity Correlation": q_correlation, "Notch Radius": r})
 		return dict
 
+	def prepare_node_stresses(self, eval_node_stresses, prestress_node_stresses=None):
+		'''Computes the principal stresses of all nodes in one batch.  With a prestress, the prestress principal 
+			stresses are reordered to align with the eval principal axes.'''
+		eval_principal_stresses = self.new_node_values(3)
+		if prestress_node_stresses is None:
+			for node_id in eval_node_stresses.keys():
+				eval_principal_stresses[node_id] = get_principal_stresses(eval_node_stresses[node_id])
+			return eval_principal_stresses, None
+		prestress_principal_stresses = self.new_node_values(3)
+		for node_id in eval_node_stresses.keys():
+			eval_principal_stresses[node_id], prestress_principal_stresses[node_id] = pair_principal_stresses(
+				eval_node_stresses[node_id], prestress_node_stresses[node_id])
+		return eval_principal_stresses, prestress_principal_stresses
+
+	def get_node_results(self, func):
+		'''Only a static prestress time step gives prestress tensors, a prestress value has no principal axes'''
+		if self.analysis_type.prestress == "Yes" and self.prestress_node_stresses is None:
+			raise ValueError("Multiaxial " + self.analysis_type.analysis + " results cannot be prestressed")
+		return UniaxialStressLife.get_node_results(self, func)
+
 	def evaluate_multiaxial_stress(self, result, stepInfo, collector):
-		'''Defines multiaxial stress evaluation function and passes it to general evaluate function'''
-		def multiaxial_stress_function(mat_props, eval_node_tensor, prestress_node_tensor=None):
-			fully_reversed_stress, _, _, result_table = self.get_multiaxial_fully_reversed_stress(mat_props, eval_node_tensor, prestress_node_tensor)
-			self.result_manager.update_result(result_table)
-			return fully_reversed_stress * self.stress_conv_factor
-		self.get_analysis_type(result, stepInfo, stress_state="Multiaxial", output="Stress")
-		self.evaluate(result, stepInfo, collector, multiaxial_stress_function)
+		'''Passes the multiaxial stress function to the general evaluate function'''
+		self.get_analysis_type(result, stepInfo.Set, stress_state="Multiaxial", output="Stress")
+		self.evaluate(result, stepInfo, collector, self.multiaxial_stress_function)
 	
 	def evaluate_multiaxial_life(self, result, stepInfo, collector):
-		'''Defines multiaxial life evaluation function and passes it to general evaluate function'''
-		def multiaxial_life_function(mat_props, eval_node_tensor, prestress_node_tensor=None):
-			fully_reversed_stress, alternating_stress, mean_stress, result_table = self.get_multiaxial_fully_reversed_stress(mat_props, eval_node_tensor, prestress_node_tensor)
-			cycles_to_failure = self.get_cycles_to_failure(mat_props, fully_reversed_stress * self.stress_conv_factor)
-			result_table[3].update({'Cycles to Failure': cycles_to_failure})
-			if self.analysis_type.result_type == "Damage - Constant":
-				cycles = self.input["Cycles"]
-				result = cycles / cycles_to_failure
-				result_table[3].update({'Applied Cycles': cycles, 'Miner Sum': result})
+		'''Passes the multiaxial life function to the general evaluate function'''
+		self.get_analysis_type(result, stepInfo.Set, stress_state="Multiaxial", output="Life")
+		self.evaluate(result, stepInfo, collector, self.multiaxial_life_function)
+		
+	def evaluate_multiaxial_safety_factor(self, result, stepInfo, collector):
+		'''Passes the multiaxial safety factor function to the general evaluate function'''
+		self.get_analysis_type(result, stepInfo.Set, stress_state="Multiaxial", output="Safety Factor")
+		self.evaluate(result, stepInfo, collector, self.multiaxial_safety_factor_function)
+		
+	def get_node_function(self, output):
+		'''Returns the node evaluation function of the given output'''
+		if output == "Stress":
+			return self.multiaxial_stress_function
+		elif output == "Safety Factor":
+			return self.multiaxial_safety_factor_function
+		else:
+			return self.multiaxial_life_function
+			
+	def multiaxial_safety_factor_function(self, mat_props, node_ids):
+		'''Calculates the safety factor result of a group of nodes sharing material properties'''
+		alt_stresses, mean_stresses, result_tables = [], [], []
+		for node_id in node_ids:
+			if self.prestress_node_stresses is None:
+				_, alternating_stress, mean_stress, result_table = self.get_multiaxial_fully_reversed_stress(mat_props, self.eval_node_stresses[node_id])
 			else:
-				result = cycles_to_failure
+				_, alternating_stress, mean_stress, result_table = self.get_multiaxial_fully_reversed_stress(mat_props, self.eval_node_stresses[node_id], 
+																											self.prestress_node_stresses[node_id])
+			alt_stresses.append(alternating_stress)
+			mean_stresses.append(mean_stress)
+			result_tables.append(result_table)
+		design_life = self.input["Design Life"]
+		allowable_stress = self.get_allowable_stress(mat_props, design_life) / self.stress_conv_factor
+		safety_factors = self.get_safety_factors(mat_props, alt_stresses, mean_stresses, allowable_stress)
+		for result_table, safety_factor in zip(result_tables, safety_factors):
+			result_table[3].update({'Allowable Stress': allowable_stress, 'Design Life': design_life, 'Safety Factor': safety_factor})
 			self.result_manager.update_result(result_table)
-			return result
-		self.get_analysis_type(result, stepInfo, stress_state="Multiaxial", output="Life")
-		self.evaluate(result, stepInfo, collector, multiaxial_life_function)		
+		return safety_factors
+		
+	def get_safety_factors(self, mat_props, alt_stresses, mean_stresses, allowable_stress):
+		'''The Sines equivalent stress is linear in the load and has its own closed form'''
+		if self.input["Multiaxial Stress Theory"] == "Equivalent Stress (Sines)":
+			return get_load_multipliers("Equivalent Stress (Sines)", alt_stresses, mean_stresses, allowable_stress, mat_props["Ftu"], 
+										self.input["Sines Constant"])
+		return UniaxialStressLife.get_safety_factors(self, mat_props, alt_stresses, mean_stresses, allowable_stress)
+			
+	def multiaxial_stress_function(self, mat_props, eval_principal_stresses, prestress_principal_stresses=None):
+		'''Calculates the fully-reversed stress result of one node'''
+		fully_reversed_stress, _, _, result_table = self.get_multiaxial_fully_reversed_stress(mat_props, eval_principal_stresses, prestress_principal_stresses)
+		self.result_manager.update_result(result_table)
+		return fully_reversed_stress * self.stress_conv_factor
+		
+	def multiaxial_life_function(self, mat_props, eval_principal_stresses, prestress_principal_stresses=None):
+		'''Calculates the life result of one node'''
+		fully_reversed_stress, alternating_stress, mean_stress, result_table = self.get_multiaxial_fully_reversed_stress(mat_props, eval_principal_stresses, prestress_principal_stresses)
+		cycles_to_failure = self.get_cycles_to_failure(mat_props, fully_reversed_stress * self.stress_conv_factor)
+		result_table[3].update({'Cycles to Failure': cycles_to_failure})
+		if self.analysis_type.result_type == "Damage - Constant":
+			cycles = self.input["Cycles"]
+			result = cycles / cycles_to_failure
+			result_table[3].update({'Applied Cycles': cycles, 'Miner Sum': result})
+		else:
+			result = cycles_to_failure
+		self.result_manager.update_result(result_table)
+		return result
 			
-	def get_multiaxial_fully_reversed_stress(self, mat_props, eval_node_tensor, prestress_node_tensor=None):
-		'''Calculates fully-reversed stress prestressd on given node tensors using selected multiaxial stress theory'''
+	def get_multiaxial_fully_reversed_stress(self, mat_props, eval_principal_stresses, prestress_principal_stresses=None):
+		'''Calculates fully-reversed stress prestressd on given principal stresses using selected multiaxial stress theory'''
 		theory = self.input["Multiaxial Stress Theory"]
-		s1a, s2a, s3a, s1m, s2m, s3m = self.get_multiaxial_alt_mean_stress(mat_props, eval_node_tensor, prestress_node_tensor)
+		s1a, s2a, s3a, s1m, s2m, s3m = self.get_multiaxial_alt_mean_stress(mat_props, eval_principal_stresses, prestress_principal_stresses)
 		alt_stress = get_von_mises([s1a, s2a, s3a])
 		if theory == "Equivalent Stress (Sines)":
 			mean_stress = s1m + s2m + s3m
@@ -678,38 +1186,24 @@ class MultiaxialEquivalentStressLife(UniaxialStressLife):
 				'Effective Mean Stress': mean_stress, 'Fully-Reversed Stress': reversed_stress}]
 		return reversed_stress, alt_stress, mean_stress, result_table
 	
-	def get_multiaxial_alt_mean_stress(self, mat_props, eval_node_tensor, prestress_node_tensor=None):
-		'''Calculates alternating and mean stresses for each principal axis'''
-		eval_principal_stresses = get_principal_stresses(eval_node_tensor)
-		if prestress_node_tensor is not None:
-			prestress_principal_stresses = get_principal_stresses(prestress_node_tensor)
-			# Match up prestress principal stresses with eval principal stresses by determining 
-			# which pairing of axes most closely gives proportional loading (eval_stress = Constant * prestress_stress).
-			min_standard_deviation = 1e100
-			for e0, e1, e2 in permutations((0, 1, 2)):
-				c0 = eval_principal_stresses[0] / prestress_principal_stresses[e0]
-				c1 = eval_principal_stresses[1] / prestress_principal_stresses[e1]
-				c2 = eval_principal_stresses[2] / prestress_principal_stresses[e2]
-				standard_deviation = stdev([c0, c1, c2])
-				if standard_deviation < min_standard_deviation:
-					min_standard_deviation = standard_deviation
-					proportional_prestress_axes = (e0, e1, e2)
-			e0, e1, e2 = proportional_prestress_axes
+	def get_multiaxial_alt_mean_stress(self, mat_props, eval_principal_stresses, prestress_principal_stresses=None):
+		'''Calculates alternating and mean stresses for each principal axis.  Prestress principal stresses must 
+			already be paired with the eval principal axes (see prepare_node_stresses).'''
 		s1max = eval_principal_stresses[0]
 		s2max = eval_principal_stresses[1]
 		s3max = eval_principal_stresses[2]
 		if self.analysis_type.load_history == "Fully-Reversed":
 			if self.analysis_type.prestress == "Yes":				
-				s1min = 2 * prestress_principal_stresses[e0] - s1max
-				s2min = 2 * prestress_principal_stresses[e1] - s2max
-				s3min = 2 * prestress_principal_stresses[e2] - s3max
+				s1min = 2 * prestress_principal_stresses[0] - s1max
+				s2min = 2 * prestress_principal_stresses[1] - s2max
+				s3min = 2 * prestress_principal_stresses[2] - s3max
 			else:
 				s1min, s2min, s3min = -s1max, -s2max, -s3max
 		elif self.analysis_type.load_history == "Half-Reversed":
 			if self.analysis_type.prestress == "Yes": 
-				s1min = prestress_principal_stresses[e0]
-				s2min = prestress_principal_stresses[e1]
-				s3min = prestress_principal_stresses[e2]
+				s1min = prestress_principal_stresses[0]
+				s2min = prestress_principal_stresses[1]
+				s3min = prestress_principal_stresses[2]
 			else:
 				s1min, s2min, s3min = 0, 0, 0
 		s1a = (s1max - s1min) / 2
@@ -730,4 +1224,44 @@ class MultiaxialEquivalentStressLife(UniaxialStressLife):
 			s1m /= Kt1
 			s2m /= Kt2
 			s3m /= Kt3
-		return s1a, s2a, s3a, s1m, s2m, s3m
\ No newline at end of file
+		return s1a, s2a, s3a, s1m, s2m, s3m
+		
+		
+# Scheduling
+
+class FatigueScheduler:
+
+	def __init__(self, analysis):
+		'''Holds what the fatigue results of an analysis share during one evaluation pass: one reader pool and the 
+			material lookups, and the scopings, stress extractions and principal stresses keyed by result sets and 
+			scoping.  Each result is still evaluated only when, and at the time step, Mechanical asks for it.'''
+		self.analysis = analysis
+		self.reader_pool = ReaderPool(analysis)
+		self.material_properties = {}
+		self.scopings = {}
+		self.extractions = {}
+		self.prepared_stresses = {}
+		self.extraction_hits = 0
+		self.prepared_hits = 0
+		self.results_evaluated = 0
+		self.results_restored = 0
+		
+	def get_fatigue_results(self):
+		'''Collects every result object of this extension in the analysis, grouped by scoping'''
+		groups = OrderedDict()
+		for result in ExtAPI.DataModel.GetUserObjects("FatigueNode"):
+			controller = getattr(result, "Controller", None)
+			if isinstance(controller, UniaxialStressLife) and result.Analysis.WorkingDir == self.analysis.WorkingDir:
+				key = tuple(result.Properties["Geometry"].Value.Ids)
+				if key not in groups:
+					groups[key] = []
+				groups[key].append(result)
+		return [result for results in groups.values() for result in results]
+		
+	def summary(self):
+		'''Describes how much work the pass shared between results'''
+		return ("Evaluate All Fatigue: " + str(self.results_evaluated) + " result steps evaluated and " + str(self.results_restored) + 
+				" restored from checkpoints, " + str(len(self.extractions)) + " shared stress extractions (reused " + 
+				str(self.extraction_hits) + " times), " + str(len(self.prepared_stresses)) + " shared principal stress evaluations (reused " + 
+				str(self.prepared_hits) + " times), " + str(len(self.scopings)) + " scoping resolutions and " + 
+				str(len(self.material_properties)) + " material lookups.  " + self.reader_pool.summary())
@@ -1,6 +1,15 @@
 from collections import OrderedDict, namedtuple
+from array import array
 import os
 import csv
+import pickle
+
+def pack(values):
+	'''Packs an array into a byte string (tostring was renamed tobytes in Python 3)'''
+	if hasattr(values, 'tobytes'):
+		return values.tobytes()
+	return values.tostring()
+	
 
 class ResultManager:
 	
@@ -19,6 +28,9 @@ class ResultManager:
 			elif analysis_type.result_type == "Damage - Constant":
 				self.running_table = OrderedDict([('Alternating Stress', 0), ('Mean Stress', 0), ('Fully-Reversed Stress', -1), ('Allowable Stress', 0), 
 													('Cycles to Failure', 0), ('Applied Cycles', 0), ('Miner Sum', 0)])
+			elif analysis_type.result_type == "Safety Factor":
+				self.running_table = OrderedDict([('Alternating Stress', 0), ('Mean Stress', 0), ('Fully-Reversed Stress', -1), ('Allowable Stress', 0), 
+													('Design Life', 0), ('Safety Factor', float('inf'))])
 			elif analysis_type.result_type == "Damage - Random":
 				self.running_table = [OrderedDict([('Stress Level', 1), ('Alternating Stress', 0), ('Mean Stress', 0), ('Fully-Reversed Stress', -1), 
 									('Cycle Percentage', 68.3), ('Applied Cycles', 0), ('Cycles to Failure', 0), ('Damage', 0)]), 
@@ -38,72 +50,218 @@ class ResultManager:
 				self.running_table[3].update({'Cycles to Failure': 0})
 				self.running_table[3].update({'Applied Cycles': 0})
 				self.running_table[3].update({'Miner Sum': 0})
+			elif analysis_type.result_type == "Safety Factor":
+				self.running_table[3].update({'Allowable Stress': 0})
+				self.running_table[3].update({'Design Life': 0})
+				self.running_table[3].update({'Safety Factor': float('inf')})
 		
 	def update_result(self, table):
 		'''Compares given node result with stored result and replaces stored result if the given result is worse'''
 		if self.analysis_type.stress_state == "Uniaxial":
-			if self.analysis_type.result_type != 'Damage - Random':
+			if self.analysis_type.result_type == 'Safety Factor':
+				if table['Safety Factor'] < self.running_table['Safety Factor']:
+					self.running_table.update(table)
+			elif self.analysis_type.result_type != 'Damage - Random':
 				if table['Fully-Reversed Stress'] > self.running_table['Fully-Reversed Stress']:
 					self.running_table.update(table)
 			else:
 				if table[3]['Miner Sum'] > self.running_table[3]['Miner Sum']:
 					for i in range(4):
 						self.running_table[i].update(table[i])
+		elif self.analysis_type.result_type == 'Safety Factor':
+			if table[3]['Safety Factor'] < self.running_table[3]['Safety Factor']:
+				for i in range(4):
+					self.running_table[i].update(table[i])
 		else:
 			if table[3]['Fully-Reversed Stress'] > self.running_table[3]['Fully-Reversed Stress']:
 				for i in range(4):
 					self.running_table[i].update(table[i])
 		
-	def store(self):
-		'''Prints result table to csv file in the analysis working directory (MECH folder)'''
-		def check_duplicate():
-			with open(self.output_file, 'r') as file:
-				reader = csv.reader(file, dialect=csv.excel, lineterminator='\n')
-				for row in reader:
-					try:
-						if int(row[0]) == self.time_step:
-							return True
-					except:
-						continue
-			return False
-		def write_multiaxial():
+	def store(self, new_file):
+		'''Prints result table of the time step to csv file in the analysis working directory (MECH folder), starting a 
+			new file or appending to the file of the run'''
+		self.write_tables([(self.time_step, self.running_table)], new_file)
+		
+	def restore(self, checkpoint):
+		'''Prints the result tables of the completed steps of a result checkpoint to a new csv file, so that the file of a 
+			resumed run holds exactly the steps the checkpoint records, without any row printed after the checkpoint was 
+			last written'''
+		self.write_tables([(time_step, checkpoint.get_running_table(time_step)) for time_step in checkpoint.steps], True)
+		
+	def write_tables(self, tables, new_file):
+		'''Prints the result tables of the given (time step, table) pairs to the csv file'''
+		def write_multiaxial(time_step, table):
 			for i in range(3):
-				writer.writerow([self.time_step] + self.running_table[i].values())
-			for key, value in self.running_table[3].items():
-				writer.writerow([self.time_step, key, " ", value])
-		if self.analysis_type.stress_state == "Uniaxial":
-			if self.analysis_type.result_type != 'Damage - Random':
-				if not os.path.exists(self.output_file):
-					with open(self.output_file, 'w') as file:
-						writer = csv.writer(file, dialect=csv.excel, lineterminator='\n')
-						writer.writerow([self.analysis_type.result_type])
-						writer.writerow(['Time Step'] + self.running_table.keys())
-						writer.writerow([self.time_step] + self.running_table.values())
+				writer.writerow([time_step] + list(table[i].values()))
+			for key, value in table[3].items():
+				writer.writerow([time_step, key, " ", value])
+		if self.analysis_type.stress_state == "Uniaxial" and self.analysis_type.result_type == 'Damage - Random':
+			# The table holds a single step
+			table = tables[-1][1]
+			with open(self.output_file, 'w') as file:
+				writer = csv.writer(file, dialect=csv.excel, lineterminator='\n')
+				writer.writerow([self.analysis_type.result_type])
+				writer.writerow(list(table[0].keys()))
+				for i in range(3):
+					writer.writerow(list(table[i].values()))
+				writer.writerow(['Miner Sum', table[3]['Miner Sum']])
+			return
+		with open(self.output_file, 'w' if new_file else 'a') as file:
+			writer = csv.writer(file, dialect=csv.excel, lineterminator='\n')
+			if new_file:
+				writer.writerow([self.analysis_type.result_type])
+				if self.analysis_type.stress_state == "Uniaxial":
+					writer.writerow(['Time Step'] + list(self.running_table.keys()))
 				else:
-					if not check_duplicate():
-						with open(self.output_file, 'a') as file:
-							writer = csv.writer(file, dialect=csv.excel, lineterminator='\n')
-							writer.writerow([self.time_step] + self.running_table.values())
-			else:
-				with open(self.output_file, 'w') as file:
-					writer = csv.writer(file, dialect=csv.excel, lineterminator='\n')
-					writer.writerow([self.analysis_type.result_type])
-					writer.writerow(self.running_table[0].keys())
-					for i in range(3):
-						writer.writerow(self.running_table[i].values())
-					writer.writerow(['Miner Sum', self.running_table[3]['Miner Sum']])
+					writer.writerow(['Time Step'] + list(self.running_table[0].keys()))
+			for time_step, table in tables:
+				if self.analysis_type.stress_state == "Uniaxial":
+					writer.writerow([time_step] + list(table.values()))
+				else:
+					write_multiaxial(time_step, table)
+		
+	def get_worst_node_row(self):
+		'''Flattens the worst-node result table into a single ordered row'''
+		if isinstance(self.running_table, list):
+			row = OrderedDict()
+			for table in self.running_table[:3]:
+				key = table.keys()[0]
+				for name, value in table.items()[1:]:
+					row.update({name + " (" + key + " " + str(table[key]) + ")": value})
+			row.update(self.running_table[3])
+			return row
 		else:
-			if not os.path.exists(self.output_file):
-				with open(self.output_file, 'w') as file:
-					writer = csv.writer(file, dialect=csv.excel, lineterminator='\n')
-					writer.writerow([self.analysis_type.result_type])
-					writer.writerow(['Time Step'] + self.running_table[0].keys())
-					write_multiaxial()
-			else:
-				if not check_duplicate():
-					with open(self.output_file, 'a') as file:
-						writer = csv.writer(file, dialect=csv.excel, lineterminator='\n')
-						writer.writerow([self.time_step] + self.running_table.values())
-						write_multiaxial()
+			return self.running_table
+		
+		
+class SweepManager:
+
+	def __init__(self, result, analysis_type, parameter_names):
+		'''Collects the worst-node result of every parameter combination of a sweep into one table'''
+		file_name = analysis_type.stress_state + " " + analysis_type.result_type + " Sweep " + str(result.Id) + ".csv"
+		self.output_file = os.path.join(result.Analysis.WorkingDir, file_name)
+		self.analysis_type = analysis_type
+		self.parameter_names = list(parameter_names)
+		self.result_names = None
+		self.rows = []
+		
+	def add(self, parameter_values, result_manager):
+		'''Stores the worst-node result of one parameter combination'''
+		row = result_manager.get_worst_node_row()
+		if self.result_names is None:
+			self.result_names = row.keys()
+		self.rows.append(list(parameter_values) + row.values())
+		
+	def count(self):
+		'''Number of parameter combinations evaluated'''
+		return len(self.rows)
+		
+	def store(self):
+		'''Prints sweep table to csv file in the analysis working directory (MECH folder)'''
+		with open(self.output_file, 'w') as file:
+			writer = csv.writer(file, dialect=csv.excel, lineterminator='\n')
+			writer.writerow([self.analysis_type.result_type + " Sweep"])
+			writer.writerow(self.parameter_names + self.result_names)
+			for row in self.rows:
+				writer.writerow(row)
+				
+				
+class ReliabilityManager:
+
+	def __init__(self, result, analysis_type, target_life, percentiles):
+		'''Collects the failure probability and percentile lives of every sampled node of a reliability evaluation'''
+		file_name = analysis_type.stress_state + " " + analysis_type.result_type + " Reliability " + str(result.Id) + ".csv"
+		self.output_file = os.path.join(result.Analysis.WorkingDir, file_name)
+		self.target_life = target_life
+		self.percentiles = percentiles
+		self.rows = []
+		
+	def add(self, node_id, failure_probability, percentile_lives):
+		'''Stores the reliability result of one node'''
+		self.rows.append([node_id, failure_probability] + list(percentile_lives))
+		
+	def store(self):
+		'''Prints reliability table to csv file in the analysis working directory (MECH folder), highest failure 
+			probability first'''
+		self.rows.sort(key=lambda row: -row[1])
+		with open(self.output_file, 'w') as file:
+			writer = csv.writer(file, dialect=csv.excel, lineterminator='\n')
+			writer.writerow(['Reliability', 'Target Life', self.target_life])
+			writer.writerow(['Node', 'Failure Probability'] + ['Life (' + str(p) + '%)' for p in self.percentiles])
+			for row in self.rows:
+				writer.writerow(row)
+				
 				
-				
\ No newline at end of file
+class CheckpointManager:
+
+	def __init__(self, result, analysis_type, signature, resume=True):
+		'''Keeps the completed time steps of a time-history run in a binary checkpoint file in the analysis working 
+			directory, so that a run interrupted by a crash or cancel resumes after the last completed step.  Each step 
+			holds the node results and the worst-node table and is appended to the file as soon as it completes.  A 
+			checkpoint written with a different signature (input, scoping or result file) is discarded, and so is any 
+			checkpoint unless resume is set.'''
+		file_name = analysis_type.stress_state + " " + analysis_type.result_type + " Checkpoint " + str(result.Id) + ".dat"
+		self.output_file = os.path.join(result.Analysis.WorkingDir, file_name)
+		self.signature = signature
+		self.steps = OrderedDict()
+		if not resume or not self.load():
+			self.save()
+			
+	def load(self):
+		'''Reads all completed steps of a checkpoint with the same signature.  Returns False if the file is missing, 
+			out of date or ends in a step cut short by a crash, so that it has to be written again.'''
+		if not os.path.exists(self.output_file):
+			return False
+		size = os.path.getsize(self.output_file)
+		with open(self.output_file, 'rb') as file:
+			try:
+				if pickle.load(file) != self.signature:
+					return False
+				while file.tell() < size:
+					time_step, node_ids, values, running_table = pickle.load(file)
+					self.steps[time_step] = (array('i', node_ids), array('d', values), running_table)
+			except Exception:
+				return False
+		return True
+		
+	def save(self):
+		'''Writes the signature and all completed steps to a new checkpoint file'''
+		with open(self.output_file, 'wb') as file:
+			pickle.dump(self.signature, file, 2)
+			for time_step in self.steps:
+				self.write_step(file, time_step)
+				
+	def write_step(self, file, time_step):
+		'''Writes one completed step with its node ids and results packed into byte strings'''
+		node_ids, values, running_table = self.steps[time_step]
+		pickle.dump((time_step, pack(node_ids), pack(values), running_table), file, 2)
+		
+	def has_step(self, time_step):
+		'''Whether the time step has been completed'''
+		return time_step in self.steps
+		
+	def count(self):
+		'''Number of completed time steps'''
+		return len(self.steps)
+		
+	def add(self, time_step, node_results, running_table):
+		'''Records a completed time step and appends it to the checkpoint file'''
+		if time_step in self.steps:
+			return
+		self.steps[time_step] = (array('i', node_results.keys()), array('d', node_results.values()), running_table)
+		with open(self.output_file, 'ab') as file:
+			self.write_step(file, time_step)
+			
+	def get_node_results(self, time_step):
+		'''Returns the node results of a completed time step'''
+		node_ids, values, _ = self.steps[time_step]
+		return OrderedDict(zip(node_ids, values))
+		
+	def get_running_table(self, time_step):
+		'''Returns the worst-node table of a completed time step'''
+		return self.steps[time_step][2]
+		
+	def remove(self):
+		'''Deletes the checkpoint file once the run is finished'''
+		if os.path.exists(self.output_file):
+			os.remove(self.output_file)
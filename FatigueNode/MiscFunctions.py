@@ -1,4 +1,5 @@
-from math import acos, cos, sqrt, pi, copysign
+from math import acos, cos, sqrt, pi, copysign, log
+from itertools import permutations
 	
 	
 def get_von_mises(principal_stresses):
@@ -21,6 +22,10 @@ def get_stress_component(stress_component, principal_stresses):
 		return principal_stresses[1]
 	elif stress_component == "Minimum Principal Stress":
 		return principal_stresses[2]
+
+def get_sines_constant(material_option):
+	'''Sines constant of a material option of the Sines Constant property, e.g. "A286 (a=0.32)"'''
+	return float(material_option.split("=")[-1].split(")")[0])
 		
 
 def get_principal_stresses(tensor):
@@ -40,14 +45,187 @@ def get_principal_stresses(tensor):
 		C = d*d*c+f*f*a+e*e*b-2*d*e*f-a*b*c
 		Q = (3*B-A**2)/9
 		R = (9*A*B-27*C-2*A**3)/54
-		phi = acos(R/sqrt(-(Q**3)))
-		s1 = 2*sqrt(-Q)*cos(phi/3)-A/3
-		s2 = 2*sqrt(-Q)*cos(phi/3 + 2*pi/3)-A/3
-		s3 = 2*sqrt(-Q)*cos(phi/3 + 4*pi/3)-A/3
-		eigs = [s1, s2, s3]
+		if Q < 0.:
+			# Round-off can push the cosine just outside [-1, 1] for repeated principal stresses
+			phi = acos(max(-1., min(1., R/sqrt(-(Q**3)))))
+			s1 = 2*sqrt(-Q)*cos(phi/3)-A/3
+			s2 = 2*sqrt(-Q)*cos(phi/3 + 2*pi/3)-A/3
+			s3 = 2*sqrt(-Q)*cos(phi/3 + 4*pi/3)-A/3
+			eigs = [s1, s2, s3]
+		else:
+			eigs = [-A/3] * 3
 	else:
 		eigs = [a, b, c]
 	return sorted(eigs, reverse=True)
+	
+
+def get_principal_directions(tensor, principal_stresses):
+	'''Computes unit eigenvectors of a symmetric tensor for its reverse-sorted principal stresses.
+		Each direction is the largest cross product of two rows of (tensor - s*I).  Directions of repeated 
+		eigenvalues are completed to an orthonormal basis.'''
+	EP = 1e-12
+	a, b, c, d, f, e = tensor[0], tensor[1], tensor[2], tensor[3], tensor[4], tensor[5]
+	scale = max(abs(x) for x in (a, b, c, d, e, f)) or 1.
+	directions = []
+	for s in principal_stresses:
+		r0 = (a-s, d, e)
+		r1 = (d, b-s, f)
+		r2 = (e, f, c-s)
+		best, best_norm = None, EP * scale**2
+		for u, v in ((r0, r1), (r0, r2), (r1, r2)):
+			w = cross(u, v)
+			norm = sqrt(dot(w, w))
+			if norm > best_norm:
+				best, best_norm = w, norm
+		if best is None:
+			directions.append(None)
+		else:
+			directions.append([x / best_norm for x in best])
+	return complete_basis(directions)
+	
+	
+def complete_basis(directions):
+	'''Fills in undetermined (None) directions so that the three directions form an orthonormal basis'''
+	known = [i for i, v in enumerate(directions) if v is not None]
+	if not known:
+		return [[1., 0., 0.], [0., 1., 0.], [0., 0., 1.]]
+	v0 = directions[known[0]]
+	if len(known) > 1:
+		# Re-orthogonalize the second known direction against the first
+		p = dot(v0, directions[known[1]])
+		w = [y - p*x for x, y in zip(v0, directions[known[1]])]
+	elif abs(v0[0]) < 0.9:
+		w = cross(v0, (1., 0., 0.))
+	else:
+		w = cross(v0, (0., 1., 0.))
+	norm = sqrt(dot(w, w))
+	v1 = [x / norm for x in w]
+	v2 = cross(v0, v1)
+	filled = list(directions)
+	if len(known) > 1:
+		filled[known[1]] = v1
+		remaining = [v2]
+	else:
+		remaining = [v1, v2]
+	for i in range(3):
+		if filled[i] is None:
+			filled[i] = remaining.pop(0)
+	return filled
+	
+	
+def get_principal_axes_pairing(eval_directions, prestress_directions):
+	'''Matches prestress principal axes to eval principal axes by direction-cosine alignment.  Returns the 
+		permutation (e0, e1, e2) of prestress axes that maximizes the total absolute direction cosine.'''
+	cosines = [[abs(dot(u, v)) for v in prestress_directions] for u in eval_directions]
+	best_alignment = -1.
+	for e0, e1, e2 in permutations((0, 1, 2)):
+		alignment = cosines[0][e0] + cosines[1][e1] + cosines[2][e2]
+		if alignment > best_alignment:
+			best_alignment = alignment
+			pairing = (e0, e1, e2)
+	return pairing
+	
+	
+def pair_principal_stresses(eval_tensor, prestress_tensor):
+	'''Computes the principal stresses of one eval and prestress tensor, with the prestress principal stresses 
+		reordered to align with the eval principal axes'''
+	eval_principal_stresses = get_principal_stresses(eval_tensor)
+	prestress_principal_stresses = get_principal_stresses(prestress_tensor)
+	e0, e1, e2 = get_principal_axes_pairing(get_principal_directions(eval_tensor, eval_principal_stresses), 
+											get_principal_directions(prestress_tensor, prestress_principal_stresses))
+	return eval_principal_stresses, [prestress_principal_stresses[e0], prestress_principal_stresses[e1], prestress_principal_stresses[e2]]
+	
+	
+def dot(u, v):
+	'''Dot product of two 3-vectors'''
+	return u[0]*v[0] + u[1]*v[1] + u[2]*v[2]
+	
+	
+def cross(u, v):
+	'''Cross product of two 3-vectors'''
+	return [u[1]*v[2] - u[2]*v[1], u[2]*v[0] - u[0]*v[2], u[0]*v[1] - u[1]*v[0]]
+
+
+
+MAX_SAFETY_FACTOR = 15.		# Safety factors are reported up to this load multiplier
+
+
+def get_load_multipliers(theory, alt_stresses, mean_stresses, allowable_stress, Ftu, sines_constant=None):
+	'''Closed-form load multipliers that bring each (alternating, mean) stress pair to the allowable fully-reversed 
+		stress under the given mean stress theory.  Every theory is linear or quadratic in the load multiplier, so no 
+		iteration is needed.'''
+	S = allowable_stress
+	multipliers = []
+	if theory == "Modified Goodman":
+		for sa, sm in zip(alt_stresses, mean_stresses):
+			denominator = sa + S*sm/Ftu if sm > 0. else sa
+			multipliers.append(S / denominator if denominator > 0. else MAX_SAFETY_FACTOR)
+	elif theory == "Modified Goodman (Extrapolated)":
+		for sa, sm in zip(alt_stresses, mean_stresses):
+			# Compressive mean stresses are credited too, so the allowable stress may never be reached
+			denominator = sa + S*sm/Ftu
+			multipliers.append(S / denominator if denominator > 0. else MAX_SAFETY_FACTOR)
+	elif theory == "Gerber":
+		for sa, sm in zip(alt_stresses, mean_stresses):
+			# k*sa = S*(1 - (k*sm/Ftu)**2) is a quadratic in k, whose positive root is taken in the form 
+			# free of cancellation for small mean stresses
+			c = S * (sm/Ftu)**2
+			if c > 0.:
+				multipliers.append(2*S / (sa + sqrt(sa*sa + 4*c*S)))
+			else:
+				multipliers.append(S / sa if sa > 0. else MAX_SAFETY_FACTOR)
+	elif theory == "Smith-Watson-Topper":
+		for sa, sm in zip(alt_stresses, mean_stresses):
+			p = sa*(sm+sa)
+			multipliers.append(S / sqrt(p) if p > 0. else MAX_SAFETY_FACTOR)
+	elif theory == "Equivalent Stress (Sines)":
+		for sa, sm in zip(alt_stresses, mean_stresses):
+			denominator = sa + sines_constant*sm
+			multipliers.append(S / denominator if denominator > 0. else MAX_SAFETY_FACTOR)
+	else:
+		raise ValueError("Unknown mean stress theory: " + str(theory))
+	return [min(k, MAX_SAFETY_FACTOR) for k in multipliers]
+	
+	
+def draw_sample(rng, distribution):
+	'''Draws one value from a distribution given as a tuple of its name and parameters:
+		("Normal", mean, standard deviation), ("Lognormal", median, log standard deviation), 
+		("Uniform", lower bound, upper bound) or ("Weibull", scale, shape)'''
+	name = distribution[0]
+	if name == "Normal":
+		return rng.gauss(distribution[1], distribution[2])
+	elif name == "Lognormal":
+		return rng.lognormvariate(log(distribution[1]), distribution[2])
+	elif name == "Uniform":
+		return rng.uniform(distribution[1], distribution[2])
+	elif name == "Weibull":
+		return rng.weibullvariate(distribution[1], distribution[2])
+	else:
+		raise ValueError("Unknown distribution: " + str(name))
+		
+		
+def percentile(sorted_values, p):
+	'''Linearly interpolated p-th percentile (0-100) of an ascending list of values'''
+	position = (len(sorted_values) - 1) * p / 100.
+	lower = int(position)
+	if lower + 1 >= len(sorted_values):
+		return sorted_values[-1]
+	return sorted_values[lower] + (sorted_values[lower+1] - sorted_values[lower]) * (position - lower)
+	
+	
+def max_relative_error(node_values, reference_node_values):
+	'''Largest relative error of node values against reference node values.  The values of a node (a number or a 
+		list) are compared relative to the largest magnitude among its reference values.'''
+	error = 0.
+	for node_id, reference in reference_node_values.items():
+		values = node_values[node_id]
+		if not isinstance(reference, (list, tuple)):
+			values, reference = [values], [reference]
+		scale = max(abs(r) for r in reference)
+		for v, r in zip(values, reference):
+			if v != r and scale > 0.:
+				error = max(error, abs(v - r) / scale)
+	return error
 
 		
 def SI_length_factor(unit_sys):
@@ -64,18 +242,3 @@ def SI_length_factor(unit_sys):
 		return 1000 / 25.4 / 12
 	elif unit_sys == "StandardBIN": # inches
 		return 1000 / 25.4
-
-		
-def mean(list):
-	'''Calculates mean of a list of numerical values'''
-	return sum(list) / len(list)
-	
-	
-def stdev(list):
-	'''Calculates standard deviation of a list of numerical values'''
-	u = mean(list)
-	n = len(list)
-	variance = 0
-	for x in list:
-		variance += (x-u)**2
-	return sqrt(variance / n)
\ No newline at end of file
@@ -0,0 +1,90 @@
+from collections import OrderedDict
+from array import array
+
+class ReaderPool:
+
+	def __init__(self, analysis):
+		'''Shares one open results reader across all reads of an evaluation (or of a time-history run).
+			Reads are queued with request() and carried out together by read() in sorted result set order,
+			so each result set is switched to at most once per read.'''
+		self.analysis = analysis
+		self.reader = None
+		self.current_set = None
+		self.last_set = None
+		self.requests = OrderedDict()
+		self.reads = 0
+		self.opens = 0
+		self.set_switches = 0
+
+	def get_reader(self):
+		'''Returns the open reader, opening it on first use'''
+		if self.reader is None:
+			self.reader = self.analysis.GetResultsData()
+			self.opens += 1
+		return self.reader
+
+	def close(self):
+		'''Releases the open reader so that the result file is not held between evaluations.  A later read opens 
+			a new reader.'''
+		if self.reader is not None:
+			self.reader.Dispose()
+			self.reader = None
+			self.current_set = None
+
+	def get_result_set_count(self):
+		'''Returns the number of result sets in the result file'''
+		self.reads += 1
+		return self.get_reader().ResultSetCount
+
+	def set_result_set(self, result_set):
+		'''Makes the given result set current, skipping the switch if it already is'''
+		reader = self.get_reader()
+		if self.current_set != result_set:
+			reader.CurrentResultSet = result_set
+			self.current_set = result_set
+			self.set_switches += 1
+		return reader
+
+	def get_unit(self, result_name, component):
+		'''Returns the unit of a result component.  Units do not change between result sets, so the
+			current set is used when there is one.'''
+		self.reads += 1
+		if self.current_set is None:
+			reader = self.set_result_set(1)
+		else:
+			reader = self.get_reader()
+		return reader.GetResult(result_name).GetComponentInfo(component).Unit
+
+	def request(self, result_set, result_name, element_ids):
+		'''Queues element values of a result for reading.  Returns the key of the values in the dictionary
+			returned by read().'''
+		key = (result_set, result_name)
+		self.reads += 1
+		if key not in self.requests:
+			self.requests[key] = set()
+		self.requests[key].update(element_ids)
+		return key
+
+	def read(self, typecode=None):
+		'''Reads all queued requests in sorted result set order.  With a typecode, the values of each element are 
+			stored in an array of that type as they are read (e.g. 'f' for single precision).'''
+		values = {}
+		for result_set, result_name in sorted(self.requests.keys()):
+			reader = self.set_result_set(result_set)
+			result = reader.GetResult(result_name)
+			element_values = {}
+			for element_id in self.requests[(result_set, result_name)]:
+				if typecode is None:
+					element_values.update({element_id: result.GetElementValues(element_id)})
+				else:
+					element_values.update({element_id: array(typecode, result.GetElementValues(element_id))})
+			values.update({(result_set, result_name): element_values})
+			self.last_set = result_set
+		self.requests.clear()
+		return values
+
+	def summary(self):
+		'''Describes how many reader opens and result set switches were avoided compared to opening
+			a new reader for every read'''
+		return ("Reader pool: " + str(self.opens) + " reader opens (" + str(self.reads - self.opens) + " avoided), " +
+				str(self.set_switches) + " set switches (" + str(self.reads - self.set_switches) + " avoided)")
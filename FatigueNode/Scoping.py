@@ -0,0 +1,109 @@
+from collections import OrderedDict
+from array import array
+
+class ScopingIndex:
+
+	def __init__(self, mesh, ref_ids, selection):
+		'''Resolves the scoped reference ids of a result to one deduplicated node index.  Nodes shared by several
+			scoped geometric entities get a single row and are owned by the last entity containing them (the
+			entity whose result the collector showed when every entity was evaluated in turn), so every
+			downstream stage runs over unique nodes.  Node and element connectivity is looked up once.'''
+		self.mesh = mesh
+		self.ref_ids = list(ref_ids)
+		self.selection = selection
+		self.rows = OrderedDict()	# Stable node id -> row mapping in order of first appearance
+		self.duplicates = 0
+		owners = {}
+		for ref_id in self.ref_ids:
+			if selection == "Geometric Entity":
+				node_ids = mesh.MeshRegionById(ref_id).NodeIds
+			else:
+				node_ids = [ref_id]
+			for node_id in node_ids:
+				if node_id in self.rows:
+					self.duplicates += 1
+				else:
+					self.rows[node_id] = len(self.rows)
+				owners[node_id] = ref_id
+		self.ref_node_ids = OrderedDict((ref_id, []) for ref_id in self.ref_ids)
+		for node_id in self.rows:
+			self.ref_node_ids[owners[node_id]].append(node_id)
+		self.connected_element_ids = {}
+		self.elements = {}
+		self.element_ids = set()	# All unique elements connected to the scoped nodes
+		for node_id in self.rows:
+			self.element_ids.update(self.get_connected_element_ids(node_id))
+
+	def get_key(self):
+		'''Identifies the scoping the index was built for'''
+		return (self.selection, tuple(self.ref_ids))
+
+	def get_node_ids(self):
+		'''Returns the unique node ids in row order'''
+		return list(self.rows.keys())
+
+	def get_connected_element_ids(self, node_id):
+		'''Returns the ids of the elements connected to a node, looking them up on first use'''
+		if node_id not in self.connected_element_ids:
+			self.connected_element_ids[node_id] = self.mesh.NodeById(node_id).ConnectedElementIds
+		return self.connected_element_ids[node_id]
+
+	def get_element(self, element_id):
+		'''Returns a mesh element, looking it up on first use'''
+		if element_id not in self.elements:
+			self.elements[element_id] = self.mesh.ElementById(element_id)
+		return self.elements[element_id]
+
+	def summary(self):
+		'''Describes how many node evaluations the deduplication saved'''
+		return ("Scoping: " + str(len(self.rows)) + " unique nodes in " + str(len(self.ref_ids)) + " reference ids (" +
+				str(self.duplicates) + " shared node duplicates removed)")
+
+
+class NodeArray:
+
+	def __init__(self, rows, width=None, typecode='f'):
+		'''Preallocates one value (width None) or a list of width values for every node of a scoping index in a single 
+			flat array, in row order.  The default single-precision storage halves the memory of Python floats held in 
+			lists, and values can be written one node at a time so that no full dictionary of lists is built first.  
+			Values are read back as double-precision Python floats, so all arithmetic on them stays in double precision.'''
+		self.rows = rows
+		self.typecode = typecode
+		self.scalar = width is None
+		self.width = 1 if self.scalar else width
+		self.values = array(typecode, [0.]) * (self.width * len(rows))
+		self.stored = array('b', [0]) * len(rows)	# Whether a value has been written for the node of each row
+		self.count = 0
+
+	def __setitem__(self, node_id, value):
+		row = self.rows[node_id]
+		i = row * self.width
+		if self.scalar:
+			self.values[i] = value
+		else:
+			self.values[i:i+self.width] = array(self.typecode, value)
+		if not self.stored[row]:
+			self.stored[row] = 1
+			self.count += 1
+
+	def __getitem__(self, node_id):
+		i = self.rows[node_id] * self.width
+		if self.scalar:
+			return self.values[i]
+		return self.values[i:i+self.width].tolist()
+
+	def __contains__(self, node_id):
+		return node_id in self.rows and self.stored[self.rows[node_id]] == 1
+
+	def __len__(self):
+		return self.count
+
+	def update(self, node_values):
+		for node_id, value in node_values.items():
+			self[node_id] = value
+
+	def keys(self):
+		return [node_id for node_id, row in self.rows.items() if self.stored[row]]
+
+	def items(self):
+		return [(node_id, self[node_id]) for node_id in self.keys()]
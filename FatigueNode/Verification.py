@@ -0,0 +1,1189 @@
+from collections import namedtuple, OrderedDict
+from itertools import permutations, product
+from random import Random
+from math import sqrt, copysign, log10
+from time import time
+import csv
+import os
+import re
+import shutil
+import tempfile
+from xml.etree import ElementTree
+from MiscFunctions import get_principal_stresses, pair_principal_stresses, get_load_multipliers, get_sines_constant, MAX_SAFETY_FACTOR
+from FileManagement import ResultManager, CheckpointManager
+import FatigueNode
+from FatigueNode import AnalysisType, UniaxialStressLife, MultiaxialEquivalentStressLife, FatigueScheduler
+
+# Differential checks of the evaluation against frozen scalar reference implementations.  The reference functions below
+# are copies of the original node-by-node evaluation (Jacobi eigenvalues in place of the closed-form principal stresses,
+# and a bisection in place of the closed-form safety factors) and must not be changed along with the code they check.
+# They include the corrections of the notch radius conversion and the Juvinall cycle bounds, which the original got
+# wrong (the radius was multiplied by the length factor and 25.4e-3 instead of divided, and 10^6 is a bitwise XOR).
+# Random and degenerate stress tensors, S-N tables and every result option combination read from FatigueNode.xml are run
+# through both, node by node and on a small quadratic mesh through the scoping, the scheduler, the checkpoint and the
+# sweep, and the largest relative error, its tolerance and the time taken by each side are reported for every case.  A
+# comparison where either side raises fails its case, and combinations the evaluation rejects have to raise ValueError.
+# Runs outside Mechanical, e.g. "ipy Verification.py" in the extension folder.
+
+STRESS_CONV_FACTOR = 1e6	# Stresses are generated in MPa, material properties in Pa
+LENGTH_CONV_FACTOR = 1000	# Notch radii are generated in mm
+XML_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "FatigueNode.xml")
+QUAD8 = "Quad8"
+QUAD8_LINK = {4: [0, 1], 5: [1, 2], 6: [2, 3], 7: [3, 0]}	# Midside nodes of a quadratic quadrilateral
+VERIFICATION_RESULT = namedtuple('Result', ['Id', 'Analysis'])(0, namedtuple('Analysis', ['WorkingDir'])(''))
+# Single-precision stresses are off by about 1e-7 of the largest stress, which cancellation in the alternating and mean
+# stresses (e.g. Sines equivalent stresses near zero) amplifies relative to the error floor of each comparison
+TOLERANCES = {"Principal Stresses": 1e-6, "Principal Axis Pairing": 1e-6, "Safety Factor Inversion": 1e-9,
+				"Double Precision": 1e-9, "Single Precision": 1e-3, "Evaluate All Fatigue": 0., "Checkpoint Restore": 0.}
+
+
+# Reference implementations
+
+def reference_eigensystem(tensor):
+	'''Reverse-sorted eigenvalues and unit eigenvectors of a symmetric tensor by cyclic Jacobi rotations'''
+	a = [[tensor[0], tensor[3], tensor[5]], [tensor[3], tensor[1], tensor[4]], [tensor[5], tensor[4], tensor[2]]]
+	v = [[1., 0., 0.], [0., 1., 0.], [0., 0., 1.]]
+	for sweep in range(50):
+		off_diagonal = a[0][1]**2 + a[0][2]**2 + a[1][2]**2
+		if off_diagonal <= 1e-32 * (a[0][0]**2 + a[1][1]**2 + a[2][2]**2 + off_diagonal):
+			break
+		for p, q in ((0, 1), (0, 2), (1, 2)):
+			if a[p][q] == 0.:
+				continue
+			theta = (a[q][q] - a[p][p]) / (2 * a[p][q])
+			t = copysign(1., theta) / (abs(theta) + sqrt(theta*theta + 1))
+			c = 1 / sqrt(t*t + 1)
+			s = t * c
+			for k in range(3):
+				a[k][p], a[k][q] = c*a[k][p] - s*a[k][q], s*a[k][p] + c*a[k][q]
+			for k in range(3):
+				a[p][k], a[q][k] = c*a[p][k] - s*a[q][k], s*a[p][k] + c*a[q][k]
+			for k in range(3):
+				v[k][p], v[k][q] = c*v[k][p] - s*v[k][q], s*v[k][p] + c*v[k][q]
+	eigensystem = sorted(((a[i][i], [v[0][i], v[1][i], v[2][i]]) for i in range(3)), key=lambda pair: -pair[0])
+	return [value for value, _ in eigensystem], [vector for _, vector in eigensystem]
+
+
+def reference_principal_stresses(tensor):
+	'''Reverse-sorted principal stresses of a stress tensor'''
+	return reference_eigensystem(tensor)[0]
+
+
+def reference_paired_principal_stresses(eval_tensor, prestress_tensor):
+	'''Prestress principal stresses reordered to the eval principal axes they are best aligned with'''
+	eval_principal_stresses, eval_directions = reference_eigensystem(eval_tensor)
+	prestress_principal_stresses, prestress_directions = reference_eigensystem(prestress_tensor)
+	alignment = lambda pairing: sum(abs(sum(x*y for x, y in zip(eval_directions[i], prestress_directions[j])))
+									for i, j in enumerate(pairing))
+	pairing = max(permutations((0, 1, 2)), key=alignment)
+	return eval_principal_stresses, [prestress_principal_stresses[j] for j in pairing]
+
+
+def reference_proportional_axes(eval_principal_stresses, prestress_principal_stresses):
+	'''Original pairing of prestress with eval principal axes: the permutation whose eval/prestress ratios are closest
+		to proportional loading (smallest standard deviation).  Agrees with the direction cosine pairing only for
+		proportional prestress.'''
+	def stdev(values):
+		u = sum(values) / len(values)
+		return sqrt(sum((x-u)**2 for x in values) / len(values))
+	min_standard_deviation = 1e100
+	for e0, e1, e2 in permutations((0, 1, 2)):
+		c0 = eval_principal_stresses[0] / prestress_principal_stresses[e0]
+		c1 = eval_principal_stresses[1] / prestress_principal_stresses[e1]
+		c2 = eval_principal_stresses[2] / prestress_principal_stresses[e2]
+		standard_deviation = stdev([c0, c1, c2])
+		if standard_deviation < min_standard_deviation:
+			min_standard_deviation = standard_deviation
+			proportional_prestress_axes = (e0, e1, e2)
+	return proportional_prestress_axes
+
+
+def reference_von_mises(principal_stresses):
+	s1, s2, s3 = principal_stresses
+	return sqrt(((s1-s2)**2 + (s1-s3)**2 + (s2-s3)**2)/2)
+
+
+def reference_stress_component(stress_component, principal_stresses):
+	if stress_component == "Von-Mises Stress (Signed)":
+		von_mises_stress = reference_von_mises(principal_stresses)
+		if abs(principal_stresses[0]) < abs(principal_stresses[2]):
+			von_mises_stress *= -1
+		return von_mises_stress
+	elif stress_component == "Maximum Principal Stress":
+		return principal_stresses[0]
+	elif stress_component == "Middle Principal Stress":
+		return principal_stresses[1]
+	elif stress_component == "Minimum Principal Stress":
+		return principal_stresses[2]
+
+
+def reference_sines_constant(material_option):
+	'''Sines constant of a material option, e.g. "A286 (a=0.32)"'''
+	return float(re.search(r"\(a=([0-9.]+)\)$", material_option).group(1))
+
+
+def reference_material_props(material, options, input):
+	'''Material properties of a material given as GetMaterialPropertyByName tables.  The notch radius is converted from
+		model length units to inches, and the cycle sensitivity is interpolated between 10**3 and 10**6 cycles (at the
+		design life for safety factors).'''
+	k_temperature = input["Temperature Factor"]
+	Ftu = k_temperature * material["Tensile Ultimate Strength"]["Tensile Ultimate Strength"][1]
+	Ftu_ksi = Ftu / 6894760
+	mat_props = {"Ftu": Ftu / STRESS_CONV_FACTOR}
+	if options["Notch"] == "Notched":
+		r = input["Notch Radius"] / LENGTH_CONV_FACTOR / .0254
+		if input["Notch Sensitivity Correlation"] == "Steel (Peterson)":
+			a = -2.58e-9*Ftu_ksi**3 + 1.62e-6*Ftu_ksi**2 - 3.55e-4*Ftu_ksi + 2.89e-2
+		else:
+			a = .020
+		q = 1 / (1 + a / r)
+		if options["Result Type"] in ("Damage - Constant", "Damage - Random", "Safety Factor"):
+			if input["Cycle Sensitivity Correlation"] != "None":
+				if input["Cycle Sensitivity Correlation"] == "Steel (Juvinall)":
+					juvinall_factor = -5.08e-6*Ftu_ksi**2 + 4.65e-3*Ftu_ksi - .212
+				else:
+					juvinall_factor = -4.57e-5*Ftu_ksi**2 + 1.4e-2*Ftu_ksi - .212
+				cycles = input["Design Life"] if options["Result Type"] == "Safety Factor" else input["Cycles"]
+				if cycles >= 1e6:
+					q *= 1.
+				elif cycles <= 1e3:
+					q *= juvinall_factor
+				else:
+					q *= juvinall_factor * (cycles/1e3)**(log10(1/juvinall_factor) / 3)
+		mat_props["Notch Sensitivity"] = q
+	if options["Output"] != "Stress":
+		mat_props["Fty"] = k_temperature * material["Tensile Yield Strength"]["Tensile Yield Strength"][1] / STRESS_CONV_FACTOR
+		SN = material["Alternating Stress"]
+		if "R-Ratio" in SN:
+			keep = [r == -1 for r in SN["R-Ratio"][1:]]
+		else:
+			keep = [sm == 0 for sm in SN["Mean Stress"][1:]]
+		k_stress = input["Scatter Factor (Stress)"] * k_temperature * input["Miscellaneous Factor"]
+		mat_props["Sdata"] = [k_stress * s for s, k in zip(SN["Alternating Stress"][1:], keep) if k]
+		mat_props["Ndata"] = [n / input["Scatter Factor (Life)"] for n, k in zip(SN["Cycles"][1:], keep) if k]
+	return mat_props
+
+
+def reference_cycles_to_failure(mat_props, fully_reversed_stress):
+	Sdata = mat_props["Sdata"]
+	Ndata = mat_props["Ndata"]
+	if fully_reversed_stress >= max(Sdata):
+		return min(Ndata)
+	elif fully_reversed_stress <= min(Sdata):
+		return max(Ndata)
+	else:
+		index = max(i for i, s in enumerate(Sdata) if s > fully_reversed_stress)
+		m = log10(Sdata[index+1]/Sdata[index]) / log10(Ndata[index+1]/Ndata[index])
+		return Ndata[index]*(fully_reversed_stress/Sdata[index])**(1/m)
+
+
+def reference_allowable_stress(mat_props, N):
+	Sdata = mat_props["Sdata"]
+	Ndata = mat_props["Ndata"]
+	if N >= max(Ndata):
+		return min(Sdata)
+	elif N <= min(Ndata):
+		return max(Sdata)
+	else:
+		index = max(i for i, n in enumerate(Ndata) if n < N)
+		m = log10(Sdata[index+1]/Sdata[index]) / log10(Ndata[index+1]/Ndata[index])
+		return Sdata[index]*(N/Ndata[index])**m
+
+
+def reference_fully_reversed_stress(theory, mat_props, sa, sm):
+	if theory == "Smith-Watson-Topper":
+		return sqrt(sa*(sm+sa)) if sa*(sm+sa) > 0. else 0.
+	Ftu = mat_props["Ftu"]
+	if theory == "Modified Goodman":
+		return sa/(1-sm/Ftu) if sm > 0. else sa
+	elif theory == "Modified Goodman (Extrapolated)":
+		return sa/(1-sm/Ftu)
+	elif theory == "Gerber":
+		return sa/(1-(sm/Ftu)**2)
+
+
+def reference_load_multiplier(fully_reversed_stress, sa, sm, allowable_stress):
+	'''Load multiplier that brings one stress pair to the allowable stress, by bisection to machine precision.  A
+		negative fully-reversed stress means the mean stress theory has broken down and counts as exceeding it.'''
+	def exceeded(k):
+		sfr = fully_reversed_stress(k*sa, k*sm)
+		return sfr < 0. or sfr >= allowable_stress
+	if not exceeded(MAX_SAFETY_FACTOR):
+		return MAX_SAFETY_FACTOR
+	lower, upper = 0., MAX_SAFETY_FACTOR
+	for _ in range(100):
+		k = (lower + upper) / 2
+		if exceeded(k):
+			upper = k
+		else:
+			lower = k
+	return upper
+
+
+def reference_uniaxial_alt_mean_stress(options, input, mat_props, eval_stress, prestress_stress):
+	'''Alternating and mean stress of a stress component, reduced by the fatigue notch factor'''
+	if prestress_stress is None:
+		prestress_stress = 0
+	if options["Analysis"] != "Static":
+		prestress_stress = input["Prestress"]
+	if options["Load History"] == "Fully-Reversed":
+		min_stress = 2 * prestress_stress - eval_stress
+	else:
+		min_stress = prestress_stress
+	sa = abs(eval_stress - min_stress) / 2.
+	sm = (eval_stress + min_stress) / 2.
+	if options["Notch"] == "Notched":
+		Kt = input["Kt"]
+		Kf = 1 + mat_props["Notch Sensitivity"]*(Kt-1)
+		sa *= Kf / Kt
+		sm *= 1 / Kt
+	return sa, sm
+
+
+def reference_multiaxial_alt_mean_stress(options, input, mat_props, eval_tensor, prestress_tensor):
+	'''Alternating and mean stresses of the principal axes, with the prestress principal axes paired by proportional
+		loading and each axis reduced by its fatigue notch factor'''
+	eval_principal_stresses = reference_principal_stresses(eval_tensor)
+	if prestress_tensor is not None:
+		prestress_principal_stresses = reference_principal_stresses(prestress_tensor)
+		e0, e1, e2 = reference_proportional_axes(eval_principal_stresses, prestress_principal_stresses)
+	s_max = eval_principal_stresses
+	if options["Load History"] == "Fully-Reversed":
+		if options["Prestress"] == "Yes":
+			s_min = [2 * prestress_principal_stresses[e] - s for e, s in zip((e0, e1, e2), s_max)]
+		else:
+			s_min = [-s for s in s_max]
+	else:
+		if options["Prestress"] == "Yes":
+			s_min = [prestress_principal_stresses[e] for e in (e0, e1, e2)]
+		else:
+			s_min = [0, 0, 0]
+	s_alt = [(s_max[i] - s_min[i]) / 2 for i in range(3)]
+	s_mean = [(s_max[i] + s_min[i]) / 2 for i in range(3)]
+	if options["Notch"] == "Notched":
+		for i, Kt in enumerate((input["Kt1"], input["Kt2"], input["Kt3"])):
+			s_alt[i] *= (1 + mat_props["Notch Sensitivity"]*(Kt-1)) / Kt
+			s_mean[i] /= Kt
+	return s_alt, s_mean
+
+
+def reference_node_result(options, input, mat_props, eval_stress, prestress_stress=None):
+	'''Result of one node from its stress tensors (its stress for spectrum analyses) in double precision, including the
+		three-band (Steinberg) damage of random vibration and bisected safety factors'''
+	output, result_type = options["Output"], options["Result Type"]
+	if options["Stress State"] == "Uniaxial":
+		if options["Analysis"] != "Spectrum":
+			eval_stress = reference_stress_component(input["Stress Component"], reference_principal_stresses(eval_stress))
+			if prestress_stress is not None:
+				prestress_stress = reference_stress_component(input["Stress Component"], reference_principal_stresses(prestress_stress))
+		theory = input["Mean Stress Theory"]
+		fully_reversed_stress = lambda sa, sm: reference_fully_reversed_stress(theory, mat_props, sa, sm)
+		if result_type == "Damage - Random":
+			damage = 0.
+			for level, fraction in ((1, .683), (2, .271), (3, .0433)):
+				sa, sm = reference_uniaxial_alt_mean_stress(options, input, mat_props, level * eval_stress, prestress_stress)
+				damage += input["Cycles"] * fraction / reference_cycles_to_failure(mat_props, fully_reversed_stress(sa, sm) * STRESS_CONV_FACTOR)
+			return damage
+		sa, sm = reference_uniaxial_alt_mean_stress(options, input, mat_props, eval_stress, prestress_stress)
+		if options["Analysis"] == "Spectrum":
+			# Spectrum stress and life results scale the fully-reversed stress, safety factors the alternating and mean stress
+			scale = input["Scale Factor"]
+			if output == "Safety Factor":
+				sa, sm = sa * scale, sm * scale
+			else:
+				fully_reversed_stress = lambda sa, sm: reference_fully_reversed_stress(theory, mat_props, sa, sm) * scale
+	else:
+		s_alt, s_mean = reference_multiaxial_alt_mean_stress(options, input, mat_props, eval_stress, prestress_stress)
+		sa = reference_von_mises(s_alt)
+		if input["Multiaxial Stress Theory"] == "Equivalent Stress (Signed Von-Mises Mean)":
+			sm = reference_von_mises(s_mean)
+		else:
+			sm = sum(s_mean)
+		if input["Multiaxial Stress Theory"] == "Equivalent Stress (Sines)":
+			# A compressive Sines equivalent stress cannot reach the allowable stress
+			fully_reversed_stress = lambda sa, sm: max(sa + input["Sines Constant"] * sm, 0.)
+		else:
+			theory = input["Mean Stress Theory"]
+			fully_reversed_stress = lambda sa, sm: reference_fully_reversed_stress(theory, mat_props, sa, sm)
+	if output == "Stress":
+		if options["Stress State"] == "Multiaxial" and input["Multiaxial Stress Theory"] == "Equivalent Stress (Sines)":
+			return (sa + input["Sines Constant"] * sm) * STRESS_CONV_FACTOR
+		return fully_reversed_stress(sa, sm) * STRESS_CONV_FACTOR
+	elif output == "Safety Factor":
+		allowable_stress = reference_allowable_stress(mat_props, input["Design Life"]) / STRESS_CONV_FACTOR
+		return reference_load_multiplier(fully_reversed_stress, sa, sm, allowable_stress)
+	if options["Stress State"] == "Multiaxial" and input["Multiaxial Stress Theory"] == "Equivalent Stress (Sines)":
+		cycles_to_failure = reference_cycles_to_failure(mat_props, (sa + input["Sines Constant"] * sm) * STRESS_CONV_FACTOR)
+	else:
+		cycles_to_failure = reference_cycles_to_failure(mat_props, fully_reversed_stress(sa, sm) * STRESS_CONV_FACTOR)
+	if result_type == "Cycles to Failure":
+		return cycles_to_failure
+	return input["Cycles"] / cycles_to_failure
+
+
+def reference_average_node_stresses(mesh, analysis, element_stresses, ref_data):
+	'''Original node averaging: the nodes of every reference id in turn, corner nodes averaged over their connected
+		elements and midside nodes interpolated from their corner nodes'''
+	def stress_init():
+		return 0. if analysis == "Spectrum" else [0., 0., 0., 0., 0., 0.]
+	node_stress_avg_map, midside_cnid_map = {}, {}
+	for _, node_ids in ref_data.values():
+		for node_id in node_ids:
+			element_ids = mesh.NodeById(node_id).ConnectedElementIds
+			node_stress = stress_init()
+			for element_id in element_ids:
+				element = mesh.ElementById(element_id)
+				cpt = element.NodeIds.IndexOf(node_id)
+				if cpt < element.CornerNodeIds.Count:
+					element_stress = element_stresses[element_id]
+					if analysis == "Spectrum":
+						node_stress += element_stress[cpt]
+					elif analysis == "Static":
+						for i in range(6):
+							node_stress[i] += element_stress[6*cpt+i]
+					else:
+						for i in range(6):
+							node_stress[i] += copysign(sqrt(element_stress[0][6*cpt+i]**2 + element_stress[1][6*cpt+i]**2), element_stress[1][6*cpt+i])
+				else:
+					itoadd = QUAD8_LINK[cpt]
+					midside_cnid_map[node_id] = [element.NodeIds[itoadd[0]], element.NodeIds[itoadd[1]]]
+					break
+			else:
+				if analysis == "Spectrum":
+					node_stress /= element_ids.Count
+				else:
+					for i in range(6):
+						node_stress[i] /= element_ids.Count
+				node_stress_avg_map[node_id] = node_stress
+	for midside_node_id, corner_node_ids in midside_cnid_map.items():
+		node_stress = stress_init()
+		for cnid in corner_node_ids:
+			if analysis == "Spectrum":
+				node_stress += node_stress_avg_map[cnid] / 2
+			else:
+				for i in range(6):
+					node_stress[i] += node_stress_avg_map[cnid][i] / 2
+		node_stress_avg_map[midside_node_id] = node_stress
+	return node_stress_avg_map
+
+
+def reference_model_results(model, options, input, selection, ref_ids, eval_time):
+	'''Original evaluation loop: stresses averaged over the nodes of every reference id and every node of every reference
+		id evaluated in turn, so that a node shared by several reference ids shows the result of the last one'''
+	analysis = options["Analysis"]
+	if analysis == "Static":
+		eval_element_stresses = model.values[(eval_time, "S")]
+	elif analysis == "Spectrum":
+		eval_element_stresses = model.values[(2, "SPSD")]
+	else:
+		eval_element_stresses = dict((element_id, [value, model.values[(eval_time+1, "S")][element_id]])
+										for element_id, value in model.values[(eval_time, "S")].items())
+	ref_data = OrderedDict()
+	for ref_id in ref_ids:
+		node_ids = model.mesh.MeshRegionById(ref_id).NodeIds if selection == "Geometric Entity" else [ref_id]
+		ref_data[ref_id] = [reference_material_props(model.materials[selection][ref_id], options, input), node_ids]
+	eval_node_stresses = reference_average_node_stresses(model.mesh, analysis, eval_element_stresses, ref_data)
+	prestress_node_stresses = None
+	if analysis == "Static" and options["Prestress"] == "Yes":
+		prestress_node_stresses = reference_average_node_stresses(model.mesh, analysis, model.values[(input["Prestress Time"], "S")], ref_data)
+	node_results = {}
+	for mat_props, node_ids in ref_data.values():
+		for node_id in node_ids:
+			prestress_stress = None if prestress_node_stresses is None else prestress_node_stresses[node_id]
+			node_results[node_id] = reference_node_result(options, input, mat_props, eval_node_stresses[node_id], prestress_stress)
+	return node_results
+
+
+# Verification inputs
+
+def make_tensors(rng, count, scale, degenerate=True):
+	'''Random stress tensors (xx, yy, zz, xy, yz, xz).  Degenerate tensors (zero, hydrostatic, uniaxial, pure shear,
+		near-zero shear and repeated principal stresses in rotated axes) are mixed in when degenerate is True.'''
+	tensors = []
+	for i in range(count):
+		kind = rng.randrange(7) if degenerate else 0
+		if kind == 0:
+			tensor = [rng.gauss(0., scale) for _ in range(6)]
+		elif kind == 1:
+			tensor = [0.] * 6
+		elif kind == 2:
+			p = rng.gauss(0., scale)
+			tensor = [p, p, p, 0., 0., 0.]
+		elif kind == 3:
+			tensor = [0.] * 6
+			tensor[rng.randrange(3)] = rng.gauss(0., scale)
+		elif kind == 4:
+			tensor = [0.] * 6
+			tensor[rng.randrange(3, 6)] = rng.gauss(0., scale)
+		elif kind == 5:
+			tensor = [rng.gauss(0., scale) for _ in range(3)] + [rng.choice((-1, 1)) * 10**rng.uniform(-7, -2) for _ in range(3)]
+		else:
+			p, q = rng.gauss(0., scale), rng.gauss(0., scale)
+			tensor = rotate_tensor(rng, [p, p, q])
+		tensors.append(tensor)
+	return tensors
+
+
+def rotate_tensor(rng, principal_stresses):
+	'''Tensor with the given principal stresses in randomly rotated axes'''
+	w, x, y, z = [rng.gauss(0., 1.) for _ in range(4)]
+	norm = sqrt(w*w + x*x + y*y + z*z)
+	w, x, y, z = w/norm, x/norm, y/norm, z/norm
+	R = [[1-2*(y*y+z*z), 2*(x*y-w*z), 2*(x*z+w*y)], [2*(x*y+w*z), 1-2*(x*x+z*z), 2*(y*z-w*x)],
+			[2*(x*z-w*y), 2*(y*z+w*x), 1-2*(x*x+y*y)]]
+	T = [[sum(R[i][k] * principal_stresses[k] * R[j][k] for k in range(3)) for j in range(3)] for i in range(3)]
+	return [T[0][0], T[1][1], T[2][2], T[0][1], T[1][2], T[0][2]]
+
+
+def scale_tensor(rng, tensor):
+	'''Tensor proportional to the given one by a random positive or negative factor'''
+	c = rng.choice((-1, 1)) * rng.uniform(.3, .8)
+	return [c * x for x in tensor]
+
+
+def make_material(rng):
+	'''Random material in the form of the GetMaterialPropertyByName tables (in Pa), with a power-law S-N curve given either
+		by R-ratio or by mean stress, and rows at other R-ratios or mean stresses that have to be left out'''
+	Ftu = rng.uniform(500., 1200.) * STRESS_CONV_FACTOR	# Within the range of the Juvinall correlations at the lowest temperature factor
+	Sf = rng.uniform(.4, .6) * Ftu
+	b = rng.uniform(-.15, -.05)
+	points = rng.randint(4, 10)
+	Ndata = [10**(3. + 5.*i/(points-1)) for i in range(points)]
+	Sdata = [Sf * (n/1e3)**b for n in Ndata]
+	rows = [(-1, s, n) for s, n in zip(Sdata, Ndata)]
+	for _ in range(rng.randint(1, 4)):
+		rows.insert(rng.randrange(len(rows) + 1), (.1, rng.choice(Sdata) * .7, rng.choice(Ndata)))
+	SN = {"Alternating Stress": ["Pa"] + [s for _, s, _ in rows], "Cycles": [""] + [n for _, _, n in rows]}
+	if rng.random() < .5:
+		SN["R-Ratio"] = [""] + [r for r, _, _ in rows]
+	else:
+		SN["Mean Stress"] = [""] + [0. if r == -1 else .2*Ftu for r, _, _ in rows]
+	return {"Tensile Ultimate Strength": {"Tensile Ultimate Strength": ["Pa", Ftu]},
+			"Tensile Yield Strength": {"Tensile Yield Strength": ["Pa", .8*Ftu]}, "Alternating Stress": SN}
+
+
+def get_stress_scale(material):
+	'''Scale of the random stresses (in MPa) evaluated with a material'''
+	return .2 * material["Tensile Ultimate Strength"]["Tensile Ultimate Strength"][1] / STRESS_CONV_FACTOR
+
+
+def get_xml_options():
+	'''Options of the select properties of every result in FatigueNode.xml, by result name and property name'''
+	results = OrderedDict()
+	for result in ElementTree.parse(XML_FILE).getroot().iter("result"):
+		properties = OrderedDict()
+		for element in result.iter():
+			attributes = element.find("attributes")
+			if element.get("control") == "select" and attributes is not None:
+				properties[element.get("name")] = attributes.get("options").split(",")
+		results[result.get("name")] = properties
+	return results
+
+
+def get_analysis_options(properties, stress_state, analysis):
+	'''Options of a result once added to an analysis system, as establish_stress_properties changes them'''
+	properties = OrderedDict((name, list(options)) for name, options in properties.items())
+	if analysis == "Static":
+		if stress_state == "Uniaxial":
+			properties["Stress Component"] += ["Maximum Principal Stress", "Middle Principal Stress", "Minimum Principal Stress"]
+		properties["Load History"] += ["Half-Reversed"]
+	elif analysis == "Spectrum":
+		properties["Load History"] += ["Half-Reversed"]
+	return properties
+
+
+def is_rejected(options):
+	'''Multiaxial results are prestressed by the stress tensors of a static time step only'''
+	return options["Stress State"] == "Multiaxial" and options["Analysis"] != "Static" and options["Prestress"] == "Yes"
+
+
+def get_option_combinations(rejected=False):
+	'''Every combination of result type and result options offered by FatigueNode.xml for each analysis system, including
+		the combinations evaluation rejects if rejected is set'''
+	for name, xml_properties in get_xml_options().items():
+		stress_state, output = name.split(" ", 1)
+		for analysis in ["Static", "Harmonic", "Spectrum"]:
+			if stress_state == "Multiaxial" and analysis == "Spectrum":
+				continue	# Multiaxial results need stress tensors
+			properties = get_analysis_options(xml_properties, stress_state, analysis)
+			if output == "Life":
+				damage = "Damage - Random" if analysis == "Spectrum" else "Damage - Constant"
+				result_types = [damage if measure == "Miner Sum" else measure for measure in properties["Life Measure"]]
+			else:
+				result_types = [output]
+			if stress_state == "Uniaxial":
+				theories = [(component, theory, None) for component, theory in
+							product(properties["Stress Component"], properties["Mean Stress Theory"])]
+			else:
+				theories = []
+				for multiaxial_theory in properties["Multiaxial Stress Theory"]:
+					if multiaxial_theory == "Equivalent Stress (Sines)":
+						theories += [(multiaxial_theory, None, sines_constant) for sines_constant in properties["Sines Constant"]]
+					else:
+						theories += [(multiaxial_theory, theory, None) for theory in properties["Mean Stress Theory"]]
+			for result_type, load_history, prestress, theory in product(result_types, properties["Load History"],
+																			properties["Prestress Select"], theories):
+				# get_input only reads the cycle sensitivity of damage and safety factor results
+				cycle_sensitivities = [None]
+				if result_type in ("Damage - Constant", "Damage - Random", "Safety Factor"):
+					cycle_sensitivities = properties["Cycle Sensitivity Correlation"]
+				notches = []
+				for notched in properties["Notch"]:
+					if notched == "Notched":
+						notches += [(notched, correlation, cycle_sensitivity) for correlation, cycle_sensitivity in
+									product(properties["Notch Sensitivity Correlation"], cycle_sensitivities)]
+					else:
+						notches += [(notched, None, None)]
+				for notched, notch_correlation, cycle_correlation in notches:
+					options = OrderedDict([("Stress State", stress_state), ("Analysis", analysis), ("Output", output),
+											("Result Type", result_type), ("Load History", load_history), ("Prestress", prestress),
+											("Notch", notched)])
+					if stress_state == "Uniaxial":
+						options.update([("Stress Component", theory[0]), ("Mean Stress Theory", theory[1])])
+					else:
+						options.update([("Multiaxial Stress Theory", theory[0]), ("Mean Stress Theory", theory[1]),
+										("Sines Constant", theory[2])])
+					options.update([("Notch Sensitivity Correlation", notch_correlation), ("Cycle Sensitivity Correlation", cycle_correlation)])
+					if is_rejected(options) == rejected:
+						yield options
+
+
+def make_input(rng, options, storage):
+	'''Random user input for the given result options, with the names get_input gives it'''
+	input = {"Temperature Factor": rng.uniform(.8, 1.), "Storage": storage}
+	notched = options["Notch"] == "Notched"
+	if options["Stress State"] == "Uniaxial":
+		input.update({"Stress Component": options["Stress Component"], "Mean Stress Theory": options["Mean Stress Theory"]})
+		if notched:
+			input.update({"Kt": rng.uniform(1., 3.)})
+	else:
+		input.update({"Multiaxial Stress Theory": options["Multiaxial Stress Theory"]})
+		if options["Sines Constant"] == "User Input":
+			input.update({"Sines Constant": rng.uniform(.2, .5)})
+		elif options["Sines Constant"] is not None:
+			input.update({"Sines Constant": get_sines_constant(options["Sines Constant"])})
+		else:
+			input.update({"Mean Stress Theory": options["Mean Stress Theory"]})
+		if notched:
+			input.update({"Kt1": rng.uniform(1., 3.), "Kt2": rng.uniform(1., 3.), "Kt3": rng.uniform(1., 3.)})
+	if notched:
+		input.update({"Notch Sensitivity Correlation": options["Notch Sensitivity Correlation"], "Notch Radius": rng.uniform(.05, 5.)})
+		if options["Cycle Sensitivity Correlation"] is not None:
+			input.update({"Cycle Sensitivity Correlation": options["Cycle Sensitivity Correlation"]})
+	if options["Result Type"] != "Stress":
+		input.update({"Scatter Factor (Stress)": rng.uniform(.7, 1.), "Scatter Factor (Life)": rng.uniform(1., 4.),
+						"Miscellaneous Factor": rng.uniform(.8, 1.)})
+	if options["Analysis"] == "Static":
+		if options["Prestress"] == "Yes":
+			# Set 3 of a verification model is proportional to set 1, the only prestress both pairings agree on
+			input.update({"Prestress Time": 3 if options["Stress State"] == "Multiaxial" else 4})
+		if options["Result Type"] == "Damage - Constant":
+			input.update({"Cycles": 10**rng.uniform(2., 8.)})
+	else:
+		input.update({"Prestress": rng.gauss(0., 50.) if options["Prestress"] == "Yes" else 0.})
+		if options["Result Type"].split(" ")[0] == "Damage":
+			input.update({"Cycles": 10**rng.uniform(2., 8.)})
+		if options["Analysis"] == "Spectrum":
+			input.update({"Scale Factor": float(rng.randint(1, 3))})
+	if options["Result Type"] == "Safety Factor":
+		input.update({"Design Life": 10**rng.uniform(2., 8.)})
+	return input
+
+
+def get_analysis_type(options, selection="Node"):
+	return AnalysisType(options["Analysis"], options["Stress State"], options["Output"], selection, options["Load History"],
+						options["Prestress"], options["Notch"], options["Result Type"])
+
+
+def make_controller(options, input):
+	'''Result controller set up for the given options without a result object'''
+	if options["Stress State"] == "Uniaxial":
+		controller = UniaxialStressLife(None, None)
+	else:
+		controller = MultiaxialEquivalentStressLife(None, None)
+	controller.analysis_type = get_analysis_type(options)
+	controller.input = input
+	controller.stress_conv_factor = STRESS_CONV_FACTOR
+	controller.result_manager = ResultManager(VERIFICATION_RESULT, controller.analysis_type, 1)
+	return controller
+
+
+def fast_node_results(controller, material, node_ids, eval_stresses, prestress_stresses):
+	'''Evaluates all nodes the way an evaluation does: batched principal stresses, the selected storage precision and
+		closed-form safety factors'''
+	controller.scoping = VerificationScoping(node_ids)
+	def store(stresses):
+		if stresses is None:
+			return None
+		node_values = controller.new_node_values(None if controller.analysis_type.analysis == "Spectrum" else 6)
+		for node_id, value in zip(node_ids, stresses):
+			node_values[node_id] = value
+		return node_values
+	controller.eval_node_stresses, controller.prestress_node_stresses = controller.prepare_node_stresses(store(eval_stresses),
+																										store(prestress_stresses))
+	mat_props = controller.build_material_props(lambda property: material[property], LENGTH_CONV_FACTOR)
+	controller.ref_data = OrderedDict([(0, [mat_props, list(node_ids)])])
+	node_results = controller.get_node_results(controller.get_node_function(controller.analysis_type.output))
+	return [node_results[node_id] for node_id in node_ids]
+
+
+class VerificationScoping:
+
+	def __init__(self, node_ids):
+		'''Node rows of a scoping without a mesh'''
+		self.rows = OrderedDict((node_id, row) for row, node_id in enumerate(node_ids))
+
+
+# Verification model
+
+class DotNetList(list):
+	'''List with the Count property and IndexOf method of the lists returned by the Mechanical API'''
+
+	@property
+	def Count(self):
+		return len(self)
+
+	def IndexOf(self, value):
+		return self.index(value) if value in self else -1
+
+
+MeshNode = namedtuple('Node', ['ConnectedElementIds'])
+MeshElement = namedtuple('Element', ['NodeIds', 'CornerNodeIds', 'Type'])
+MeshRegion = namedtuple('MeshRegion', ['NodeIds'])
+Property = namedtuple('Property', ['Value'])
+Selection = namedtuple('Selection', ['Ids'])
+VerificationResult = namedtuple('Result', ['Id', 'Analysis', 'Properties', 'CalculateTimeHistory'])
+
+
+class VerificationMesh:
+
+	def __init__(self, elements, regions):
+		'''A strip of quadratic quadrilaterals (nodes 1.. along the bottom, 1001.. along the top and midside nodes from
+			2001, 3001 and 4001) with mesh regions of overlapping element ranges'''
+		bottom, top = lambda k: 1 + k, lambda k: 1001 + k
+		bottom_midside, top_midside, vertical_midside = lambda k: 2001 + k, lambda k: 3001 + k, lambda k: 4001 + k
+		self.elements = OrderedDict()
+		connected = OrderedDict()
+		for k in range(elements):
+			node_ids = [bottom(k), bottom(k+1), top(k+1), top(k), bottom_midside(k), vertical_midside(k+1), top_midside(k), vertical_midside(k)]
+			self.elements[k+1] = MeshElement(DotNetList(node_ids), DotNetList(node_ids[:4]), QUAD8)
+			for node_id in node_ids:
+				connected.setdefault(node_id, DotNetList()).append(k+1)
+		self.nodes = OrderedDict((node_id, MeshNode(element_ids)) for node_id, element_ids in connected.items())
+		self.regions = OrderedDict()
+		step = max(1, elements // regions)
+		for i in range(regions):
+			node_ids = DotNetList()
+			for element_id in range(1 + i*step, min(elements, (i+2)*step) + 1):
+				node_ids.extend(node_id for node_id in self.elements[element_id].NodeIds if node_id not in node_ids)
+			self.regions[i+1] = MeshRegion(node_ids)
+
+	def NodeById(self, node_id):
+		return self.nodes[node_id]
+
+	def ElementById(self, element_id):
+		return self.elements[element_id]
+
+	def MeshRegionById(self, ref_id):
+		return self.regions[ref_id]
+
+
+class VerificationReader:
+
+	def __init__(self, model):
+		'''Results reader of a verification model'''
+		self.model = model
+		self.CurrentResultSet = None
+		self.ResultSetCount = max(result_set for result_set, _ in model.values)
+		self.disposed = False
+
+	def GetResult(self, result_name):
+		return VerificationResultValues(self.model.values[(self.CurrentResultSet, result_name)])
+
+	def Dispose(self):
+		self.disposed = True
+
+
+class VerificationResultValues:
+
+	def __init__(self, values):
+		self.values = values
+
+	def GetElementValues(self, element_id):
+		return list(self.values[element_id])
+
+
+class VerificationAnalysis:
+
+	def __init__(self, model, working_dir):
+		'''Analysis of a verification model'''
+		self.model = model
+		self.MeshData = model.mesh
+		self.GeoData = None
+		self.WorkingDir = working_dir
+
+	def GetResultsData(self):
+		return VerificationReader(self.model)
+
+
+class VerificationModel:
+
+	def __init__(self, rng, working_dir, elements=12, regions=4, scale=100.):
+		'''A mesh with a material for every mesh region and node, and random element corner stresses (in MPa) in result
+			sets 1 to 4 and a stress spectrum in set 2.  Set 3 is proportional to set 1, so that it can be the prestress
+			of multiaxial results.'''
+		self.mesh = VerificationMesh(elements, regions)
+		self.analysis = VerificationAnalysis(self, working_dir)
+		materials = [make_material(rng) for _ in range(regions)]
+		self.materials = {"Geometric Entity": dict((ref_id, materials[i]) for i, ref_id in enumerate(self.mesh.regions)),
+							"Node": dict((node_id, rng.choice(materials)) for node_id in self.mesh.nodes)}
+		self.values = {}
+		for result_set in (1, 2, 4):
+			self.values[(result_set, "S")] = dict((element_id, [rng.gauss(0., scale) for _ in range(24)]) for element_id in self.mesh.elements)
+		c = rng.choice((-1, 1)) * rng.uniform(.3, .8)
+		self.values[(3, "S")] = dict((element_id, [c * x for x in values]) for element_id, values in self.values[(1, "S")].items())
+		self.values[(2, "SPSD")] = dict((element_id, [abs(rng.gauss(0., scale)) for _ in range(4)]) for element_id in self.mesh.elements)
+
+	def get_ref_ids(self, rng, selection):
+		'''All mesh regions, or a random sample of corner nodes with the midside nodes between them (a midside node is 
+			interpolated from its corner nodes, so it can only be scoped with them)'''
+		if selection == "Geometric Entity":
+			return list(self.mesh.regions.keys())
+		corner_node_ids = set(node_id for element in self.mesh.elements.values() for node_id in element.CornerNodeIds)
+		ref_ids = set(rng.sample(sorted(corner_node_ids), len(corner_node_ids) // 2))
+		for element in self.mesh.elements.values():
+			for cpt, (i, j) in QUAD8_LINK.items():
+				if element.NodeIds[i] in ref_ids and element.NodeIds[j] in ref_ids:
+					ref_ids.add(element.NodeIds[cpt])
+		ref_ids = sorted(ref_ids)
+		rng.shuffle(ref_ids)
+		return ref_ids
+
+	def get_result(self, result_id, ref_ids, time_history=False):
+		return VerificationResult(result_id, self.analysis, {"Geometry": Property(Selection(DotNetList(ref_ids)))}, time_history)
+
+
+class VerificationInput:
+
+	def get_input(self):
+		'''The input of the verification, in place of the result properties'''
+		return dict(self.verification_input)
+
+	def get_material_props(self, ref_id):
+		'''Material properties from the verification materials, in place of the material library'''
+		return self.build_material_props(lambda property: self.materials[ref_id][property], LENGTH_CONV_FACTOR)
+
+	def get_stress_conv_factor(self):
+		return STRESS_CONV_FACTOR
+
+
+class VerificationUniaxial(VerificationInput, UniaxialStressLife):
+	pass
+
+
+class VerificationMultiaxial(VerificationInput, MultiaxialEquivalentStressLife):
+	pass
+
+
+def make_model_controller(model, options, input, selection, ref_ids, eval_time=1, result_id=1, scheduler=None):
+	'''Result controller initialized on a verification model the way evaluate initializes it'''
+	if options["Stress State"] == "Uniaxial":
+		controller = VerificationUniaxial(None, None)
+	else:
+		controller = VerificationMultiaxial(None, None)
+	result = model.get_result(result_id, ref_ids)
+	controller.analysis_type = get_analysis_type(options, selection)
+	controller.result_manager = ResultManager(result, controller.analysis_type, eval_time)
+	controller.verification_input = input
+	controller.materials = model.materials[selection]
+	controller.scheduler = scheduler
+	controller.reinit(result, eval_time)
+	return controller
+
+
+def fast_model_results(controller, eval_time=1):
+	'''Extracts the node stresses of the scoping and evaluates all its nodes'''
+	controller.extract_node_stresses(eval_time)
+	return controller.get_node_results(controller.get_node_function(controller.analysis_type.output))
+
+
+# Verification cases
+
+class CaseReport:
+
+	def __init__(self, case, tolerance):
+		'''Collects the comparisons of one verification case'''
+		self.case = case
+		self.tolerance = tolerance
+		self.comparisons = 0
+		self.max_error = 0.
+		self.worst_case = ""
+		self.both_raised = []
+		self.mismatches = []
+		self.reference_time = 0.
+		self.fast_time = 0.
+
+	def run(self, description, reference, fast, relative_floor=1e-3):
+		'''Times the reference and fast functions and compares their results, lists of values or dictionaries of node
+			values.  Errors are relative to each reference value, floored at relative_floor times the largest reference
+			value of the comparison.'''
+		reference_results, reference_error = self.timed(reference, "reference_time")
+		fast_results, fast_error = self.timed(fast, "fast_time")
+		self.comparisons += 1
+		if reference_error is not None and fast_error is not None:
+			self.both_raised.append(description + ": " + repr(reference_error) + " / " + repr(fast_error))
+			return
+		elif reference_error is not None or fast_error is not None:
+			self.mismatches.append(description + ": " + repr(reference_error) + " / " + repr(fast_error))
+			return
+		if isinstance(reference_results, dict):
+			keys = sorted(reference_results.keys())
+			if keys != sorted(fast_results.keys()):
+				self.mismatches.append(description + ": results for different nodes")
+				return
+			reference_results = [reference_results[key] for key in keys]
+			fast_results = [fast_results[key] for key in keys]
+		elif len(reference_results) != len(fast_results):
+			self.mismatches.append(description + ": " + str(len(reference_results)) + " / " + str(len(fast_results)) + " results")
+			return
+		floor = relative_floor * max([abs(value) for value in reference_results] + [0.])
+		for value, reference_value in zip(fast_results, reference_results):
+			if value != reference_value:
+				scale = max(abs(reference_value), floor)
+				error = abs(value - reference_value) / scale if scale > 0. else float('inf')
+				if error > self.max_error:
+					self.max_error, self.worst_case = error, description
+
+	def check(self, description, passed):
+		'''Records a mismatch if a condition of the case does not hold'''
+		if not passed:
+			self.mismatches.append(description)
+
+	def timed(self, func, timer):
+		start = time()
+		try:
+			results, error = func(), None
+		except Exception as e:
+			results, error = None, e
+		setattr(self, timer, getattr(self, timer) + time() - start)
+		return results, error
+
+	def passed(self):
+		return self.max_error <= self.tolerance and not self.mismatches and not self.both_raised
+
+	def get_row(self):
+		'''Flattens the report into a single ordered row'''
+		speedup = self.reference_time / self.fast_time if self.fast_time > 0. else float('inf')
+		return OrderedDict([('Case', self.case), ('Comparisons', self.comparisons), ('Max Relative Error', self.max_error),
+							('Tolerance', self.tolerance), ('Passed', self.passed()), ('Both Raised', len(self.both_raised)),
+							('Mismatches', len(self.mismatches)), ('Reference Time (s)', self.reference_time),
+							('Fast Time (s)', self.fast_time), ('Speedup', speedup), ('Worst Case', self.worst_case)])
+
+
+def describe(options, selection=None):
+	return ", ".join(str(value) for value in list(options.values()) + [selection] if value is not None)
+
+
+def verify_principal_stresses(rng, samples):
+	'''Closed-form principal stresses against Jacobi eigenvalues, relative to the largest principal stress'''
+	report = CaseReport("Principal Stresses", TOLERANCES["Principal Stresses"])
+	for tensor in make_tensors(rng, samples, 100.):
+		report.run(repr(tensor), lambda: reference_principal_stresses(tensor), lambda: get_principal_stresses(tensor), 1.)
+	return report
+
+
+def verify_principal_axis_pairing(rng, samples):
+	'''Prestress principal stresses paired with the eval principal axes against pairing by Jacobi eigenvectors'''
+	report = CaseReport("Principal Axis Pairing", TOLERANCES["Principal Axis Pairing"])
+	for eval_tensor, prestress_tensor in zip(make_tensors(rng, samples, 100., False), make_tensors(rng, samples, 100., False)):
+		if rng.random() < .5:
+			# Prestress in the eval principal axes with different principal stresses, so the pairing is known
+			prestress_tensor = [x + rng.uniform(-.5, .5) * (i < 3) * max(abs(y) for y in eval_tensor) for i, x in enumerate(eval_tensor)]
+		report.run(repr((eval_tensor, prestress_tensor)), lambda: sum(reference_paired_principal_stresses(eval_tensor, prestress_tensor), []),
+					lambda: sum(pair_principal_stresses(eval_tensor, prestress_tensor), []), 1.)
+	return report
+
+
+def verify_safety_factor_inversion(rng, samples):
+	'''Closed-form load multipliers against bisection on the fully-reversed stress of each mean stress theory'''
+	report = CaseReport("Safety Factor Inversion", TOLERANCES["Safety Factor Inversion"])
+	for theory in ["Modified Goodman", "Modified Goodman (Extrapolated)", "Gerber", "Smith-Watson-Topper", "Equivalent Stress (Sines)"]:
+		for sample in range(samples):
+			Ftu = rng.uniform(400., 1200.)
+			alt_stresses = [abs(rng.gauss(0., .2*Ftu)) for _ in range(10)]
+			mean_stresses = [rng.gauss(0., .3*Ftu) for _ in range(10)]
+			allowable_stress = rng.uniform(.1, .6) * Ftu
+			sines_constant = rng.uniform(.2, .5)
+			if theory == "Equivalent Stress (Sines)":
+				fully_reversed_stress = lambda sa, sm: max(sa + sines_constant * sm, 0.)
+			else:
+				fully_reversed_stress = lambda sa, sm: reference_fully_reversed_stress(theory, {"Ftu": Ftu}, sa, sm)
+			report.run(theory + " " + repr((alt_stresses, mean_stresses, allowable_stress, Ftu)),
+						lambda: [reference_load_multiplier(fully_reversed_stress, sa, sm, allowable_stress)
+									for sa, sm in zip(alt_stresses, mean_stresses)],
+						lambda: get_load_multipliers(theory, alt_stresses, mean_stresses, allowable_stress, Ftu, sines_constant))
+	return report
+
+
+def verify_node_evaluation(rng, nodes, storage):
+	'''Every result option combination evaluated node by node by the reference functions against the batched evaluation
+		with the given storage.  Multiaxial prestress is proportional to the eval stress, since the original pairing of
+		principal axes only holds for proportional loading.'''
+	report = CaseReport("Node Evaluation (" + storage + ")", TOLERANCES[storage])
+	node_ids = range(1, nodes+1)
+	for options in get_option_combinations():
+		input = make_input(rng, options, storage)
+		if options.get("Sines Constant") not in (None, "User Input"):
+			report.check(describe(options) + ": Sines constant " + str(input["Sines Constant"]),
+							input["Sines Constant"] == reference_sines_constant(options["Sines Constant"]))
+		material = make_material(rng)
+		scale = get_stress_scale(material)
+		if options["Analysis"] == "Spectrum":
+			eval_stresses = [abs(rng.gauss(0., scale)) for _ in node_ids]
+		else:
+			eval_stresses = make_tensors(rng, nodes, scale, False)
+		prestress_stresses = None
+		if options["Analysis"] == "Static" and options["Prestress"] == "Yes":
+			if options["Stress State"] == "Multiaxial":
+				prestress_stresses = [scale_tensor(rng, tensor) for tensor in eval_stresses]
+			else:
+				prestress_stresses = make_tensors(rng, nodes, scale, False)
+		def reference():
+			mat_props = reference_material_props(material, options, input)
+			return [reference_node_result(options, input, mat_props, eval_stresses[i], None if prestress_stresses is None else prestress_stresses[i])
+					for i in range(nodes)]
+		fast = make_controller(options, input)
+		report.run(describe(options), reference, lambda: fast_node_results(fast, material, node_ids, eval_stresses, prestress_stresses))
+	for options in get_option_combinations(rejected=True):
+		input = make_input(rng, options, storage)
+		material = make_material(rng)
+		eval_stresses = make_tensors(rng, nodes, get_stress_scale(material), False)
+		try:
+			fast_node_results(make_controller(options, input), material, node_ids, eval_stresses, None)
+		except ValueError:
+			continue
+		except Exception as e:
+			report.check(describe(options) + ": rejected with " + repr(e), False)
+		else:
+			report.check(describe(options) + ": evaluated", False)
+	return report
+
+
+def verify_scoping(rng, working_dir, storage, fraction=.25):
+	'''Results on a quadratic mesh scoped to overlapping mesh regions or to nodes, read, deduplicated and averaged by the
+		scoping index, against the original loop over the nodes of every reference id.  A random fraction of the option
+		combinations is run.'''
+	report = CaseReport("Scoping and Averaging (" + storage + ")", TOLERANCES[storage])
+	model = VerificationModel(rng, working_dir)
+	for options in get_option_combinations():
+		if rng.random() > fraction:
+			continue
+		input = make_input(rng, options, storage)
+		selection = rng.choice(["Geometric Entity", "Node"])
+		ref_ids = model.get_ref_ids(rng, selection)
+		report.run(describe(options, selection), lambda: reference_model_results(model, options, input, selection, ref_ids, 1),
+					lambda: fast_model_results(make_model_controller(model, options, input, selection, ref_ids)))
+	return report
+
+
+def verify_scheduler(rng, working_dir):
+	'''Results of every type evaluated at two time steps in one Evaluate All Fatigue pass, sharing the reader, scopings,
+		extractions and principal stresses of the pass, against each result evaluated on its own.  The pass has to open
+		one reader and extract the stresses once for every combination of result sets and storage.'''
+	report = CaseReport("Evaluate All Fatigue", TOLERANCES["Evaluate All Fatigue"])
+	model = VerificationModel(rng, working_dir)
+	scheduler = FatigueScheduler(model.analysis)
+	combinations = [options for options in get_option_combinations() if options["Analysis"] == "Static" and options["Notch"] == "Unnotched"]
+	selection = "Geometric Entity"
+	ref_ids = model.get_ref_ids(rng, selection)
+	extraction_keys, prepared_keys = set(), set()
+	for eval_time in (1, 2):
+		for result_id, options in enumerate(rng.sample(combinations, 12)):
+			input = make_input(rng, options, rng.choice(["Double Precision", "Single Precision"]))
+			key = (eval_time, input.get("Prestress Time"), input["Storage"])
+			extraction_keys.add(key)
+			prepared_keys.add((options["Stress State"],) + key)
+			report.run(describe(options) + " at step " + str(eval_time),
+						lambda: fast_model_results(make_model_controller(model, options, input, selection, ref_ids, eval_time, result_id), eval_time),
+						lambda: fast_model_results(make_model_controller(model, options, input, selection, ref_ids, eval_time, result_id, scheduler), eval_time))
+	report.check("reader opened " + str(scheduler.reader_pool.opens) + " times", scheduler.reader_pool.opens == 1)
+	report.check(str(len(scheduler.extractions)) + " extractions for " + str(len(extraction_keys)) + " result set combinations",
+					len(scheduler.extractions) == len(extraction_keys))
+	report.check(str(len(scheduler.prepared_stresses)) + " principal stress evaluations for " + str(len(prepared_keys)) + " combinations",
+					len(scheduler.prepared_stresses) == len(prepared_keys))
+	report.check(str(len(scheduler.scopings)) + " scoping resolutions", len(scheduler.scopings) == 1)
+	report.check(str(scheduler.extraction_hits) + " reused extractions for " + str(report.comparisons) + " results",
+					scheduler.extraction_hits == report.comparisons - len(extraction_keys))
+	report.check(str(scheduler.prepared_hits) + " reused principal stress evaluations for " + str(report.comparisons) + " results",
+					scheduler.prepared_hits == report.comparisons - len(prepared_keys))
+	# Time-history results keep none of their stresses in the pass
+	controller = make_model_controller(model, options, input, selection, ref_ids, 4, scheduler=scheduler)
+	controller.result = model.get_result(1, ref_ids, True)
+	fast_model_results(controller, 4)
+	report.check("stresses of a time-history result kept in the pass",
+					len(scheduler.extractions) == len(extraction_keys) and len(scheduler.prepared_stresses) == len(prepared_keys))
+	reader = scheduler.reader_pool.reader
+	scheduler.reader_pool.close()
+	report.check("reader released at the end of the pass", reader.disposed and scheduler.reader_pool.reader is None)
+	# A result evaluated on its own keeps its reader only for the following steps of a time-history run
+	for time_history, eval_time in ((False, 1), (True, 1), (True, 4)):
+		controller = make_model_controller(model, options, input, selection, ref_ids, eval_time)
+		controller.result = model.get_result(1, ref_ids, time_history)
+		fast_model_results(controller, eval_time)
+		reader = controller.reader_pool.reader
+		controller.release_reader_pool()
+		kept = time_history and controller.reader_pool.last_set < reader.ResultSetCount
+		report.check("reader " + ("kept" if kept else "released") + " after step " + str(eval_time) + 
+						(" of a time-history run" if time_history else ""), reader.disposed != kept)
+	return report
+
+
+def verify_checkpoint(rng, working_dir, results=8):
+	'''Node results and worst-node tables of completed time steps restored from a result checkpoint against the evaluation
+		that wrote them.  A checkpoint with another signature restores nothing, and one cut short in its last step
+		restores the steps before it.'''
+	report = CaseReport("Checkpoint Restore", TOLERANCES["Checkpoint Restore"])
+	model = VerificationModel(rng, working_dir)
+	combinations = list(get_option_combinations())
+	for result_id in range(results):
+		options = rng.choice(combinations)
+		input = make_input(rng, options, "Double Precision")
+		selection = rng.choice(["Geometric Entity", "Node"])
+		ref_ids = model.get_ref_ids(rng, selection)
+		signature = repr((result_id, describe(options, selection)))
+		steps = OrderedDict()
+		try:
+			for eval_time in (1, 2):
+				controller = make_model_controller(model, options, input, selection, ref_ids, eval_time, result_id)
+				steps[controller.result_manager.time_step] = (fast_model_results(controller, eval_time), controller.result_manager.running_table)
+		except Exception as e:
+			report.check(describe(options, selection) + ": raised " + repr(e), False)
+			continue
+		checkpoint = CheckpointManager(model.get_result(result_id, ref_ids), controller.analysis_type, signature)
+		for time_step, (node_results, running_table) in steps.items():
+			checkpoint.add(time_step, node_results, running_table)
+		for time_step, (node_results, running_table) in steps.items():
+			controller = make_model_controller(model, options, input, selection, ref_ids, time_step, result_id)
+			restored = CheckpointManager(controller.result, controller.analysis_type, signature)
+			report.run(describe(options, selection) + " at step " + str(time_step), lambda: fast_model_results(controller, time_step),
+						lambda: restored.get_node_results(time_step))
+			report.check(describe(options, selection) + ": worst-node table of step " + str(time_step),
+							restored.has_step(time_step) and restored.get_running_table(time_step) == running_table)
+		changed = CheckpointManager(controller.result, controller.analysis_type, signature + " changed")
+		report.check(describe(options, selection) + ": restored from a checkpoint with another signature", changed.count() == 0)
+		checkpoint = CheckpointManager(controller.result, controller.analysis_type, signature)
+		for time_step, (node_results, running_table) in steps.items():
+			checkpoint.add(time_step, node_results, running_table)
+		with open(checkpoint.output_file, 'rb+') as file:
+			file.truncate(os.path.getsize(checkpoint.output_file) - 5)
+		truncated = CheckpointManager(controller.result, controller.analysis_type, signature)
+		report.check(describe(options, selection) + ": restored " + str(truncated.count()) + " steps from a checkpoint cut short",
+						truncated.count() == len(steps) - 1)
+		if controller.analysis_type.result_type != "Damage - Random":
+			# A row printed after the checkpoint was last written is dropped when the csv file is printed again
+			result_manager = controller.result_manager
+			result_manager.store(new_file=True)
+			result_manager.store(new_file=False)
+			result_manager.restore(truncated)
+			with open(result_manager.output_file, 'r') as file:
+				printed_steps = list(OrderedDict((row[0], None) for row in list(csv.reader(file))[2:]))
+			report.check(describe(options, selection) + ": csv file of a resumed run prints steps " + ", ".join(printed_steps),
+							printed_steps == [str(time_step) for time_step in truncated.steps])
+		fresh = CheckpointManager(controller.result, controller.analysis_type, signature, resume=False)
+		report.check(describe(options, selection) + ": restored " + str(fresh.count()) + " steps without resuming", fresh.count() == 0)
+	return report
+
+
+def get_sweep_grid(input):
+	'''Two values of every swept input of the result'''
+	grid = OrderedDict([("Temperature Factor", [.8, 1.])])
+	for name, values in [("Mean Stress Theory", ["Modified Goodman", "Smith-Watson-Topper"]), ("Kt", [1.5, 2.5]), ("Kt2", [1.5, 2.5]),
+							("Notch Radius", [.2, 2.]), ("Scatter Factor (Stress)", [.8, 1.]), ("Cycles", [1e4, 1e7]),
+							("Design Life", [1e4, 1e7]), ("Sines Constant", [.25, .5])]:
+		if name in input:
+			grid[name] = values
+	return grid
+
+
+def verify_sweep(rng, working_dir, sweeps=16):
+	'''Every combination of a parameter sweep, evaluated on the stresses extracted once, against a reference evaluation
+		of the model with the input of the combination.  The input is restored after the sweep.'''
+	report = CaseReport("Parameter Sweep", TOLERANCES["Double Precision"])
+	model = VerificationModel(rng, working_dir)
+	combinations = list(get_option_combinations())
+	for _ in range(sweeps):
+		options = rng.choice(combinations)
+		input = make_input(rng, options, "Double Precision")
+		selection = rng.choice(["Geometric Entity", "Node"])
+		ref_ids = model.get_ref_ids(rng, selection)
+		grid = get_sweep_grid(input)
+		names = list(grid.keys())
+		combination_inputs = [dict(input, **dict(zip(names, values))) for values in product(*[grid[name] for name in names])]
+		def reference():
+			results = {}
+			for i, combination_input in enumerate(combination_inputs):
+				results.update(((i, node_id), value) for node_id, value in
+								reference_model_results(model, options, combination_input, selection, ref_ids, 1).items())
+			return results
+		controller = make_model_controller(model, options, input, selection, ref_ids)
+		def fast():
+			controller.extract_node_stresses(1)
+			func = controller.get_node_function(options["Output"])
+			results = {}
+			for i, (_, node_results) in enumerate(controller.get_sweep_node_results(func, names, grid, 1)):
+				results.update(((i, node_id), value) for node_id, value in node_results.items())
+			return results
+		report.run(describe(options, selection) + " over " + ", ".join(names), reference, fast)
+		report.check(describe(options, selection) + ": input restored after the sweep", controller.input == input)
+		for name in [name for name in input if name in controller.extraction_inputs + controller.selector_inputs]:
+			try:
+				controller.check_input_names([name])
+			except ValueError:
+				continue
+			report.check(describe(options, selection) + ': sweep over "' + name + '" accepted', False)
+	return report
+
+
+def run_verification(samples=200, nodes=10, seed=0):
+	'''Runs every verification case and returns their reports'''
+	rng = Random(seed)
+	working_dir = tempfile.mkdtemp()
+	try:
+		return [verify_principal_stresses(rng, samples), verify_principal_axis_pairing(rng, samples),
+				verify_safety_factor_inversion(rng, samples), verify_node_evaluation(rng, nodes, "Double Precision"),
+				verify_node_evaluation(rng, nodes, "Single Precision"), verify_scoping(rng, working_dir, "Double Precision"),
+				verify_scoping(rng, working_dir, "Single Precision"), verify_scheduler(rng, working_dir),
+				verify_checkpoint(rng, working_dir), verify_sweep(rng, working_dir)]
+	finally:
+		shutil.rmtree(working_dir)
+
+
+def format_report(reports):
+	'''Formats the reports as a text table followed by any mismatched exceptions'''
+	lines = []
+	for report in reports:
+		row = report.get_row()
+		lines.append(("%-40s %6d comparisons  max error %.3g (tolerance %.0e) %s  reference %.3fs, fast %.3fs (x%.1f)" %
+						(row['Case'], row['Comparisons'], row['Max Relative Error'], row['Tolerance'],
+						"PASSED" if row['Passed'] else "FAILED", row['Reference Time (s)'], row['Fast Time (s)'], row['Speedup'])))
+		if report.both_raised:
+			lines.append("    " + str(len(report.both_raised)) + " comparisons raised on both paths, e.g. " + report.both_raised[0])
+		if row['Max Relative Error'] > 0.:
+			lines.append("    worst: " + row['Worst Case'])
+		for mismatch in report.mismatches:
+			lines.append("    mismatch: " + mismatch)
+	return "\n".join(lines)
+
+
+def write_report(reports, output_file):
+	'''Prints the reports to a csv file'''
+	with open(output_file, 'w') as file:
+		writer = csv.writer(file, dialect=csv.excel, lineterminator='\n')
+		writer.writerow(reports[0].get_row().keys())
+		for report in reports:
+			writer.writerow(report.get_row().values())
+
+
+if __name__ == "__main__":
+	FatigueNode.link = {QUAD8: QUAD8_LINK}	# get_link builds the map from element types that only exist in Mechanical
+	print(format_report(run_verification()))